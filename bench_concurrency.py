@@ -0,0 +1,98 @@
+"""Multi-threaded stress test for a shared NetflixMovieRecommender.
+
+Each thread drives its own set of users with a mix of recommendation reads,
+watches and ratings. Throughput is reported per thread count; on a
+free-threaded CPython build (python3.13t and later) it should grow with the
+number of threads. Consistency of every user's history is checked at the end.
+
+    python bench_concurrency.py --threads 1 2 4 8 --seconds 3
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from netflix_movie import NetflixMovieRecommender
+
+GENRES = ["Action", "Drama", "Comedy", "Horror", "Sci-Fi", "Romance", "Crime", "Thriller", "Documentary"]
+CATEGORIES = ["Netflix Original", "Classic", "Blockbuster"]
+REC_TYPES = ["for_you", "because_you_watched", "top_picks", "trending_now"]
+
+
+def build_recommender(catalog_size: int, seed: int) -> NetflixMovieRecommender:
+    rng = random.Random(seed)
+    recommender = NetflixMovieRecommender(quiet=True)
+    for movie_id in range(1000, 1000 + catalog_size):
+        recommender.movies.add({
+            "id": movie_id, "title": f"Movie {movie_id}", "genre": rng.sample(GENRES, rng.randint(1, 3)),
+            "year": rng.randint(1980, 2025), "rating": round(rng.uniform(4, 9.5), 1),
+            "duration": rng.randint(70, 180), "category": rng.choice(CATEGORIES), "tags": [],
+        })
+    return recommender
+
+
+def worker(recommender, usernames, movie_ids, deadline, seed, counts, index):
+    rng = random.Random(seed)
+    ops = watches = 0
+    while time.perf_counter() < deadline:
+        username = rng.choice(usernames)
+        roll = rng.random()
+        if roll < 0.2:
+            recommender.watch_movie(username, rng.choice(movie_ids))
+            watches += 1
+        elif roll < 0.3:
+            recommender.rate_movie(username, rng.choice(movie_ids), rng.randint(1, 10))
+        else:
+            recommender.get_recommendations(username, rng.choice(REC_TYPES))
+        ops += 1
+    counts[index] = (ops, watches)
+
+
+def run(recommender, threads: int, seconds: float, users_per_thread: int, seed: int) -> dict:
+    movie_ids = [movie["id"] for movie in recommender.movies]
+    user_sets = [[f"t{threads}-w{t}-u{u}" for u in range(users_per_thread)] for t in range(threads)]
+    for usernames in user_sets:
+        for username in usernames:
+            recommender.create_user_profile(username, {"favorite_genres": random.Random(username).sample(GENRES, 2)})
+
+    counts = [None] * threads
+    deadline = time.perf_counter() + seconds
+    pool = [threading.Thread(target=worker, args=(recommender, user_sets[t], movie_ids, deadline, seed + t, counts, t))
+            for t in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ops = sum(c[0] for c in counts)
+    watches = sum(c[1] for c in counts)
+    recorded = sum(len(recommender.viewing_history[u]) for usernames in user_sets for u in usernames)
+    return {"threads": threads, "ops": ops, "ops_per_second": ops / elapsed,
+            "watches": watches, "consistent": recorded == watches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--catalog-size", type=int, default=5000)
+    parser.add_argument("--users-per-thread", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    gil = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    recommender = build_recommender(args.catalog_size, args.seed)
+    baseline = None
+    for threads in args.threads:
+        result = run(recommender, threads, args.seconds, args.users_per_thread, args.seed)
+        baseline = baseline or result["ops_per_second"]
+        print(f"{threads:>3} threads: {result['ops_per_second']:>10.0f} ops/s "
+              f"(x{result['ops_per_second'] / baseline:.2f})  consistent={result['consistent']}")
+
+
+if __name__ == "__main__":
+    main()
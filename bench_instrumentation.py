@@ -0,0 +1,71 @@
+"""Per-call overhead of the recommender's opt-in instrumentation.
+
+Times cheap, cache-served calls on one recommender in three states: never
+instrumented, instrumented (with and without slow-call profiling), and
+instrumented then disabled again. The disabled state should match the
+baseline, since disabling removes the method wrappers.
+
+    python bench_instrumentation.py --movies 5000 --calls 20000
+"""
+import argparse
+import time
+from typing import Callable
+
+from bench_suite import SyntheticStorage, generate_users
+from netflix_movie import NetflixMovieRecommender
+
+
+def per_call(operation: Callable, calls: int, repeats: int) -> float:
+    """Best of repeats, in microseconds per call"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(args.movies, args.seed), quiet=True)
+    (username, preferences), = generate_users(1, args.seed + 1)
+    recommender.create_user_profile(username, preferences)
+    for movie_id in range(1, 21):
+        recommender.watch_movie(username, movie_id)
+
+    operations = {
+        "get_recommendations": lambda: recommender.get_recommendations(username),
+        "get_user_stats": lambda: recommender.get_user_stats(username),
+    }
+    for operation in operations.values():
+        per_call(operation, args.calls, 1)
+
+    states = [
+        ("baseline", lambda: None),
+        ("enabled", lambda: recommender.enable_instrumentation()),
+        ("enabled+profiling", lambda: recommender.enable_instrumentation(slow_threshold=0.1)),
+        ("disabled", recommender.disable_instrumentation),
+    ]
+    results = {}
+    for state, apply in states:
+        apply()
+        results[state] = {name: per_call(operation, args.calls, args.repeats) for name, operation in operations.items()}
+
+    print(f"{args.movies} movies, {args.calls} calls x best of {args.repeats}, microseconds per call")
+    print(f"{'':20}" + "".join(f"{name:>22}" for name in operations))
+    for state, timings in results.items():
+        cells = "".join(f"{timings[name]:10.2f} ({timings[name] - results['baseline'][name]:+6.2f})"
+                        .rjust(22) for name in operations)
+        print(f"{state:20}{cells}")
+    recommender.close()
+
+
+if __name__ == "__main__":
+    main()
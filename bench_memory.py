@@ -0,0 +1,74 @@
+"""Memory comparison of plain-dict and compact catalog and viewing history layouts.
+
+Builds the same synthetic catalog and histories twice: once as the original
+dicts (movie dicts with string lists, one dict and datetime per watch) and
+once as MovieRecord and ViewingHistory. Sizes are measured with tracemalloc.
+
+    python bench_memory.py --movies 100000 --users 10000 --events-per-user 200
+"""
+import argparse
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from netflix_records import MovieRecord, ViewingHistory
+
+GENRES = ["Action", "Drama", "Comedy", "Horror", "Sci-Fi", "Romance", "Crime", "Thriller", "Documentary"]
+CATEGORIES = ["Netflix Original", "Classic", "Blockbuster"]
+TAGS = [f"tag{i}" for i in range(200)]
+
+
+def movie_dicts(count: int, seed: int):
+    rng = random.Random(seed)
+    for movie_id in range(count):
+        # Strings are rebuilt per movie, as when loaded from storage
+        yield {
+            "id": movie_id, "title": f"Movie {movie_id}", "genre": [g + "" for g in rng.sample(GENRES, rng.randint(1, 3))],
+            "year": rng.randint(1980, 2025), "rating": round(rng.uniform(4, 9.5), 1),
+            "duration": rng.randint(70, 180), "category": rng.choice(CATEGORIES) + "",
+            "tags": [t + "" for t in rng.sample(TAGS, 3)],
+        }
+
+
+def watch_records(count: int, movies: int, rng: random.Random):
+    start = datetime(2024, 1, 1)
+    for _ in range(count):
+        yield {"movie_id": rng.randrange(movies), "watched_date": start + timedelta(seconds=rng.randrange(10 ** 7)),
+               "completion_percentage": rng.randint(70, 100)}
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--events-per-user", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    def histories(wrap):
+        rng = random.Random(args.seed)
+        return {f"user{u}": wrap(watch_records(args.events_per_user, args.movies, rng)) for u in range(args.users)}
+
+    results = [
+        ("catalog", measure(lambda: list(movie_dicts(args.movies, args.seed))),
+         measure(lambda: [MovieRecord(m) for m in movie_dicts(args.movies, args.seed)])),
+        ("viewing history", measure(lambda: histories(list)), measure(lambda: histories(ViewingHistory))),
+    ]
+
+    print(f"{args.movies} movies, {args.users} users x {args.events_per_user} watches")
+    print(f"{'':16} {'dicts':>12} {'compact':>12} {'ratio':>7}")
+    for name, plain, compact in results:
+        print(f"{name:16} {plain / 2 ** 20:10.1f}MB {compact / 2 ** 20:10.1f}MB {plain / max(compact, 1):6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
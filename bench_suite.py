@@ -0,0 +1,281 @@
+"""Reproducible benchmark suite for NetflixMovieRecommender.
+
+Generates a seeded synthetic catalog and a user population with power-law
+viewing histories (a few heavy viewers, a long tail of light ones, watches
+concentrated on popular titles), ingests the events, then measures latency
+percentiles and throughput of search_movies, every get_recommendations type,
+get_user_stats and single watch events. Results are written as JSON so runs
+can be compared across versions; --tracemalloc adds a memory profile.
+
+    python bench_suite.py --movies 1000 100000 --users 5000 --output results.json
+    python bench_suite.py --movies 10000 --tracemalloc
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from netflix_cache import RecommendationCache
+from netflix_movie import RECOMMENDATION_TYPES, NetflixMovieRecommender, np
+from netflix_storage import StorageBackend
+
+GENRES = ["Action", "Drama", "Comedy", "Horror", "Sci-Fi", "Romance", "Crime", "Thriller", "Documentary",
+          "Animation", "Fantasy", "Mystery", "Family", "Biography", "Music", "War", "Western", "History"]
+CATEGORIES = ["Netflix Original", "Classic", "Blockbuster", "International", "Independent", "Documentary"]
+SYLLABLES = ["ka", "lo", "mi", "ra", "then", "dor", "vel", "sa", "qu", "in", "bar", "ne", "to", "ri", "an",
+             "sha", "gor", "el", "ith", "mo", "ur", "zen", "fa", "lu", "ver", "o", "pe", "dra", "ky", "ost"]
+
+
+def words(rng: random.Random, count: int) -> List[str]:
+    """Distinct pronounceable pseudo-words"""
+    vocabulary = set()
+    while len(vocabulary) < count:
+        vocabulary.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(vocabulary)
+
+
+def power_law_rank(rng: random.Random, n: int) -> int:
+    """Rank in [0, n) drawn with probability falling off roughly as 1 / rank (Zipf, s = 1)"""
+    return min(n - 1, int(n ** rng.random()) - 1)
+
+
+def scatter(rank: int, n: int) -> int:
+    """Spread popularity ranks over the catalog so popular movies are not all adjacent ids"""
+    return (rank * 2654435761) % n  # the multiplier is prime, so this is a permutation
+
+
+def generate_movies(count: int, seed: int) -> Iterator[Dict]:
+    """Seeded synthetic catalog; titles draw on a word list so search has realistic selectivity"""
+    rng = random.Random(seed)
+    title_words = words(rng, 5000)
+    tags = words(rng, 2000)
+    this_year = datetime.now().year
+    for movie_id in range(1, count + 1):
+        yield {
+            "id": movie_id,
+            "title": " ".join(rng.choices(title_words, k=rng.randint(1, 4))).title(),
+            "genre": rng.sample(GENRES, rng.choice((1, 1, 2, 2, 2, 3))),
+            "year": this_year - min(int(rng.expovariate(1 / 12)), 80),
+            "rating": round(min(9.8, max(1.0, rng.gauss(6.4, 1.1))), 1),
+            "duration": rng.randint(75, 180),
+            "category": rng.choice(CATEGORIES),
+            "tags": list(dict.fromkeys(tags[power_law_rank(rng, len(tags))] for _ in range(3))),
+        }
+
+
+def generate_users(count: int, seed: int) -> Iterator[tuple]:
+    """(username, profile preferences) pairs"""
+    rng = random.Random(seed)
+    for user in range(count):
+        liked = rng.sample(GENRES, rng.randint(1, 4))
+        disliked = rng.sample([g for g in GENRES if g not in liked], rng.randint(0, 2))
+        low = rng.choice((5.0, 6.0, 7.0))
+        yield f"user{user:07d}", {
+            "favorite_genres": liked,
+            "disliked_genres": disliked,
+            "preferred_rating_range": (low, 10.0),
+            "preferred_duration_range": (rng.choice((60, 80, 90)), rng.choice((120, 150, 200))),
+        }
+
+
+def generate_events(usernames: Sequence[str], movie_count: int, seed: int, mean_history: float = 20,
+                    max_history: int = 5000, days: int = 90) -> Iterator[Dict]:
+    """Watch events with Pareto-distributed history lengths over Zipf-popular movies; ~1 in 5 is rated"""
+    rng = random.Random(seed)
+    alpha = 1.5  # mean of paretovariate(1.5) is 3
+    start = datetime.now() - timedelta(days=days)
+    for username in usernames:
+        length = min(max_history, max(1, int(rng.paretovariate(alpha) * mean_history / 3)))
+        offsets = sorted(rng.random() * days * 86400 for _ in range(length))
+        for offset in offsets:
+            movie_id = scatter(power_law_rank(rng, movie_count), movie_count) + 1
+            yield {"type": "watch", "username": username, "movie_id": movie_id,
+                   "watched_date": (start + timedelta(seconds=offset)).timestamp(),
+                   "completion_percentage": min(100, int(rng.betavariate(5, 1.2) * 100) + 1)}
+            if rng.random() < 0.2:
+                yield {"type": "rate", "username": username, "movie_id": movie_id,
+                       "rating": max(1, min(10, round(rng.gauss(7, 1.8))))}
+
+
+class SyntheticStorage(StorageBackend):
+    """Storage whose catalog is a generated one; user state stays in memory"""
+
+    def __init__(self, movie_count: int, seed: int):
+        self.movie_count = movie_count
+        self.seed = seed
+
+    def load_movies(self) -> List[Dict]:
+        return list(generate_movies(self.movie_count, self.seed))
+
+
+def summarize(latencies: List[float]) -> Dict:
+    """Latency percentiles in milliseconds and sequential throughput"""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": total / len(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_second": len(ordered) / total if total else 0.0,
+    }
+
+
+def measure(operation: Callable, arguments: List[tuple], warmup: int) -> Dict:
+    for args in arguments[:warmup]:
+        operation(*args)
+    latencies = []
+    for args in arguments[warmup:]:
+        started = time.perf_counter()
+        operation(*args)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def timed(step: Callable) -> float:
+    started = time.perf_counter()
+    step()
+    return time.perf_counter() - started
+
+
+def memory_profile(top: int = 15) -> Dict:
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return {
+        "current_mb": current / 2 ** 20,
+        "peak_mb": peak / 2 ** 20,
+        "top": [{"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                 "size_mb": s.size / 2 ** 20, "count": s.count} for s in statistics],
+    }
+
+
+def run(movie_count: int, args: argparse.Namespace) -> Dict:
+    """Build one catalog size, ingest its users' events and measure every operation"""
+    if args.tracemalloc:
+        tracemalloc.start()
+    result: Dict = {"movies": movie_count, "users": args.users, "build_seconds": {}, "operations": {}, "skipped": {}}
+    build = result["build_seconds"]
+    rng = random.Random(args.seed)
+
+    holder = {}
+    build["catalog"] = timed(lambda: holder.setdefault(
+        "recommender", NetflixMovieRecommender(storage=SyntheticStorage(movie_count, args.seed), quiet=True)))
+    recommender: NetflixMovieRecommender = holder["recommender"]
+    if not args.cache:
+        recommender.recommendation_cache = RecommendationCache(max_items=0)
+
+    users = list(generate_users(args.users, args.seed + 1))
+    build["profiles"] = timed(lambda: [recommender.create_user_profile(u, p) for u, p in users])
+    usernames = [u for u, _ in users]
+
+    events = generate_events(usernames, movie_count, args.seed + 2, args.mean_history)
+    report = recommender.ingest_events(events, chunk_size=args.chunk_size)
+    result["ingest"] = {key: report[key] for key in ("events", "watches", "ratings", "rejected", "seconds",
+                                                     "events_per_second")}
+    histories = [len(recommender.viewing_history[u]) for u in usernames]
+    result["history_length"] = {"mean": sum(histories) / len(histories), "max": max(histories)}
+
+    if np is not None:
+        build["collaborative_model"] = timed(recommender.train_collaborative_model)
+        if args.ann:
+            build["ann_index"] = timed(lambda: holder.setdefault("ann_recall", recommender.build_ann_index()))
+            result["ann_recall"] = holder["ann_recall"]
+    if movie_count <= args.similarity_limit:
+        build["similarity_index"] = timed(recommender.build_similarity_index)
+
+    if args.tracemalloc:
+        result["memory"] = memory_profile()
+        tracemalloc.stop()
+
+    samples = args.requests + args.warmup
+    sample_users = [(rng.choice(usernames),) for _ in range(samples)]
+    titles = [m["title"].split() for m in (recommender.movies.get(rng.randint(1, movie_count)) for _ in range(samples))]
+    queries = [(rng.choice(t)[:rng.randint(3, 6)],) for t in titles]
+    operations = result["operations"]
+
+    operations["search_movies"] = measure(recommender.search_movies, queries, args.warmup)
+    for recommendation_type in RECOMMENDATION_TYPES:
+        name = f"get_recommendations:{recommendation_type}"
+        if recommendation_type == "because_you_watched" and movie_count > args.similarity_limit:
+            result["skipped"][name] = "neighbour index build is quadratic; raise --similarity-limit to include"
+            continue
+        operations[name] = measure(lambda u: recommender.get_recommendations(u, recommendation_type),
+                                   sample_users, args.warmup)
+    operations["get_user_stats"] = measure(recommender.get_user_stats, sample_users, args.warmup)
+    watches = [(u, rng.randint(1, movie_count)) for (u,) in sample_users]
+    operations["watch_movie"] = measure(recommender.watch_movie, watches, args.warmup)
+
+    recommender.close()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, nargs="+", default=[1000, 10000],
+                        help="catalog sizes to run, e.g. 1000 100000 10000000")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--mean-history", type=float, default=20, help="mean watches per user")
+    parser.add_argument("--requests", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed calls per operation before timing")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="ingest chunk size")
+    parser.add_argument("--similarity-limit", type=int, default=100000,
+                        help="largest catalog to build the neighbour index for")
+    parser.add_argument("--ann", action="store_true", help="serve for you / top picks through the ANN index")
+    parser.add_argument("--cache", action="store_true", help="keep the recommendation cache enabled")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="profile memory after setup (slows the build steps it covers)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__ if np is not None else None,
+            "arguments": vars(args),
+        },
+        "runs": [],
+    }
+    for movie_count in args.movies:
+        run_result = run(movie_count, args)
+        results["runs"].append(run_result)
+
+        print(f"\n{movie_count} movies, {args.users} users, "
+              f"ingest {run_result['ingest']['events_per_second']:,.0f} events/s")
+        print(f"{'operation':42} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+        for name, stats in run_result["operations"].items():
+            print(f"{name:42} {stats['p50_ms']:9.3f} {stats['p90_ms']:9.3f} {stats['p99_ms']:9.3f} "
+                  f"{stats['ops_per_second']:10.0f}")
+        for name, reason in run_result["skipped"].items():
+            print(f"{name:42} skipped: {reason}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
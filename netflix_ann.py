@@ -0,0 +1,157 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file approximate maximum inner product index over movie vectors.
+
+    Vectors are clustered with k-means; a query scores the centroids, then
+    scores exactly only the vectors in the n_probe best clusters; tune() picks
+    the smallest n_probe that reaches a recall target on sample queries.
+    Arrays are stored contiguously per cluster so a saved index can be
+    memory-mapped and shared by worker processes.
+    """
+
+    def __init__(self, dimensions: List[str], n_lists: Optional[int] = None, n_probe: int = 8, seed: int = 0):
+        self.dimensions = dimensions
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.catalog_version = None
+        # MovieCatalog.fingerprint() of the catalog the index was built from
+        self.catalog_fingerprint: Optional[str] = None
+        # recall_at_k measured by tune(), or None
+        self.recall: Optional[float] = None
+        self.centroids = np.zeros((0, len(dimensions)))
+        self.vectors = np.zeros((0, len(dimensions)))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def build(self, ids: np.ndarray, vectors: np.ndarray, iterations: int = 10) -> "IVFIndex":
+        """Cluster vectors and lay them out grouped by cluster"""
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(ids))))
+        n_lists = min(n_lists, max(1, len(ids)))
+        rng = np.random.default_rng(self.seed)
+
+        # Train centroids on a sample so build time does not grow with catalog size
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest(sample, centroids)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+
+        assignment = self._nearest(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        self.centroids = centroids
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.ids = np.asarray(ids)[order]
+        self.offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1)).astype(np.int64)
+        self.n_lists = n_lists
+        return self
+
+    def query_vector(self, weights: Dict[str, float]) -> np.ndarray:
+        """Dense query from {dimension name: weight}; unknown dimensions are ignored"""
+        index = {name: i for i, name in enumerate(self.dimensions)}
+        query = np.zeros(len(self.dimensions))
+        for name, weight in weights.items():
+            if name in index:
+                query[index[name]] = weight
+        return query
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        """Ids of approximately the k vectors with the highest inner product"""
+        return self.ids[self._search_rows(query, k)]
+
+    def exact_search(self, query: np.ndarray, k: int) -> np.ndarray:
+        """Ids of exactly the k vectors with the highest inner product"""
+        return self.ids[self._top_rows(self.vectors @ query, np.arange(len(self.ids)), k)]
+
+    def recall_at_k(self, queries: np.ndarray, k: int) -> float:
+        """Mean fraction of the exact top k that search() also returns.
+
+        A result that ties the exact k-th best score counts as a hit, since
+        which of several equally scored vectors make the cut is arbitrary.
+        """
+        return self._recall(queries, [self._kth_score(query, k) for query in queries], k)
+
+    def tune(self, queries: np.ndarray, k: int, target_recall: float) -> float:
+        """Set n_probe to the fewest lists, doubling from one, whose recall_at_k reaches target_recall.
+
+        Returns the recall reached, which is below target only if every list
+        is probed, i.e. the search is exact.
+        """
+        thresholds = [self._kth_score(query, k) for query in queries]
+        self.n_probe = 1
+        while True:
+            self.recall = self._recall(queries, thresholds, k)
+            if self.recall >= target_recall or self.n_probe >= self.n_lists:
+                return self.recall
+            self.n_probe = min(2 * self.n_probe, self.n_lists)
+
+    def save(self, directory: str) -> None:
+        """Write the index as .npy arrays plus a JSON metadata file"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"dimensions": self.dimensions, "n_lists": self.n_lists, "n_probe": self.n_probe,
+                       "seed": self.seed, "catalog_version": self.catalog_version,
+                       "catalog_fingerprint": self.catalog_fingerprint, "recall": self.recall}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "IVFIndex":
+        """Load a saved index; with mmap the arrays are shared through the page cache"""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["dimensions"], meta["n_lists"], meta["n_probe"], meta["seed"])
+        index.catalog_version = meta["catalog_version"]
+        index.catalog_fingerprint = meta.get("catalog_fingerprint")
+        index.recall = meta.get("recall")
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None))
+        return index
+
+    def _search_rows(self, query: np.ndarray, k: int) -> np.ndarray:
+        probe = np.argsort(-(self.centroids @ query), kind="stable")[:self.n_probe]
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe])
+        return self._top_rows(self.vectors[rows] @ query, rows, k)
+
+    def _kth_score(self, query: np.ndarray, k: int) -> float:
+        """Exact k-th highest inner product, or -inf when there are at most k vectors"""
+        if len(self.ids) <= k:
+            return -np.inf
+        scores = self.vectors @ query
+        return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+    def _recall(self, queries: np.ndarray, thresholds: List[float], k: int) -> float:
+        if not len(queries) or not len(self.ids):
+            return 1.0
+        expected = min(k, len(self.ids))
+        hits = 0
+        for query, threshold in zip(queries, thresholds):
+            found = self.vectors[self._search_rows(query, k)] @ query
+            hits += min(expected, np.count_nonzero(found >= threshold - 1e-9))
+        return float(hits / (expected * len(queries)))
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Closest centroid per vector, computed in chunks to bound memory"""
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignment[start:start + chunk_size] = (centroid_norms - 2 * chunk @ centroids.T).argmin(axis=1)
+        return assignment
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+        if len(rows) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[best], scores[best]
+        return rows[np.argsort(-scores, kind="stable")]
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+
+class RecommendationCache:
+    """LRU cache of recommendation lists with a TTL and a bound on cached movie references.
+
+    max_items caps the total length of all cached lists, which is what the
+    cache's memory use grows with; least recently used entries are evicted
+    first. Entries older than ttl seconds are treated as misses. All methods
+    are thread-safe; pass the token() taken before computing a value to put()
+    so a result computed from state that was invalidated meanwhile is dropped.
+    """
+
+    GENERATION_STRIPES = 1024
+
+    def __init__(self, max_items: int = 100000, ttl: Optional[float] = 300.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._by_user: Dict[str, set] = {}
+        self._items = 0
+        self._lock = threading.Lock()
+        self._generations = [0] * self.GENERATION_STRIPES
+        self._clears = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[1] > self.ttl):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def token(self, username: Optional[str] = None) -> tuple:
+        """Invalidation state to hand back to put()"""
+        return self._clears, self._generations[self._stripe(username)]
+
+    def put(self, key: Hashable, value: List[Dict], username: Optional[str] = None,
+            token: Optional[tuple] = None) -> None:
+        """Cache value; username ties the entry to that user's invalidations"""
+        with self._lock:
+            if token is not None and token != (self._clears, self._generations[self._stripe(username)]):
+                return
+            if key in self._entries:
+                self._remove(key)
+            if len(value) > self.max_items:
+                return
+            self._entries[key] = (value, time.monotonic(), username)
+            self._items += len(value)
+            if username is not None:
+                self._by_user.setdefault(username, set()).add(key)
+            while self._items > self.max_items:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, username: str) -> None:
+        """Drop every entry computed for username"""
+        with self._lock:
+            self._generations[self._stripe(username)] += 1
+            for key in self._by_user.pop(username, ()):
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after a catalog or model change"""
+        with self._lock:
+            self._clears += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_user.clear()
+            self._items = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "items": self._items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _stripe(self, username: Optional[str]) -> int:
+        return hash(username) % self.GENERATION_STRIPES
+
+    def _remove(self, key: Hashable) -> None:
+        value, _, username = self._entries.pop(key)
+        self._items -= len(value)
+        if username is not None:
+            keys = self._by_user.get(username)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[username]
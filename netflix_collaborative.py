@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class CollaborativeFilteringModel:
+    """User x movie matrix factorization trained with alternating least squares.
+
+    Preferences are explicit ratings or completion-derived scores on the 1-10
+    scale. Only observed entries are fitted (weighted-lambda regularization),
+    and scores are dot products of user and movie factors.
+    """
+
+    def __init__(self, factors: int = 32, regularization: float = 0.1, iterations: int = 10, seed: int = 0):
+        self.factors = factors
+        self.regularization = regularization
+        self.iterations = iterations
+        self.seed = seed
+        self.mean = 0.0
+        self.movie_ids = np.zeros(0, dtype=np.int64)
+        self.movie_index: Dict[int, int] = {}
+        self.movie_factors = np.zeros((0, factors))
+        self.user_index: Dict[str, int] = {}
+        self.user_factors = np.zeros((0, factors))
+        self._folded: Dict[str, np.ndarray] = {}
+        # Caller-defined version of the data each user's factors were fitted to
+        self.user_versions: Dict[str, int] = {}
+
+    def fit(self, preferences: Dict[str, Dict[int, float]],
+            versions: Optional[Dict[str, int]] = None) -> "CollaborativeFilteringModel":
+        """Train on {username: {movie_id: preference}}, recording each user's data version if given"""
+        usernames = [u for u, prefs in preferences.items() if prefs]
+        self.user_versions = {u: versions[u] for u in usernames if u in versions} if versions else {}
+        self.movie_ids = np.array(sorted({m for u in usernames for m in preferences[u]}), dtype=np.int64)
+        self.movie_index = {int(m): i for i, m in enumerate(self.movie_ids)}
+        self.user_index = {u: i for i, u in enumerate(usernames)}
+        self._folded = {}
+
+        user_rows, movie_cols, values = [], [], []
+        for username in usernames:
+            for movie_id, value in preferences[username].items():
+                user_rows.append(self.user_index[username])
+                movie_cols.append(self.movie_index[movie_id])
+                values.append(value)
+        user_rows = np.array(user_rows, dtype=np.int64)
+        movie_cols = np.array(movie_cols, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        self.mean = float(values.mean()) if len(values) else 0.0
+        residuals = values - self.mean
+
+        rng = np.random.default_rng(self.seed)
+        self.user_factors = rng.normal(0, 0.1, (len(usernames), self.factors))
+        self.movie_factors = rng.normal(0, 0.1, (len(self.movie_ids), self.factors))
+        by_user = self._group(user_rows, movie_cols, residuals, len(usernames))
+        by_movie = self._group(movie_cols, user_rows, residuals, len(self.movie_ids))
+        for _ in range(self.iterations):
+            self.user_factors = self._solve_all(self.movie_factors, by_user)
+            self.movie_factors = self._solve_all(self.user_factors, by_movie)
+        return self
+
+    def fold_in(self, username: str, preferences: Dict[int, float], version: Optional[int] = None) -> None:
+        """Fit a user's factors against the fixed movie factors, without retraining"""
+        cols = [self.movie_index[m] for m in preferences if m in self.movie_index]
+        values = np.array([preferences[m] for m in preferences if m in self.movie_index], dtype=np.float64)
+        self._folded[username] = self._solve(self.movie_factors, np.array(cols, dtype=np.int64), values - self.mean)
+        if version is not None:
+            self.user_versions[username] = version
+
+    def has_user(self, username: str) -> bool:
+        return username in self._folded or username in self.user_index
+
+    def recommend(self, username: str, exclude: set, k: int) -> List[int]:
+        """Movie ids with the highest predicted preference, best first"""
+        vector = self._user_vector(username)
+        if vector is None or not len(self.movie_ids):
+            return []
+        scores = self.movie_factors @ vector
+        excluded = [self.movie_index[m] for m in exclude if m in self.movie_index]
+        scores[excluded] = -np.inf
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [int(self.movie_ids[i]) for i in ranked]
+
+    def save(self, path: str) -> None:
+        """Write the model to an .npz file"""
+        usernames = list(self.user_index) + list(self._folded)
+        user_factors = np.vstack([self.user_factors] + [v[None, :] for v in self._folded.values()])
+        np.savez(path, mean=self.mean, movie_ids=self.movie_ids, movie_factors=self.movie_factors,
+                 usernames=np.array(usernames, dtype=str), user_factors=user_factors,
+                 config=np.array([self.factors, self.regularization, self.iterations, self.seed]))
+
+    @classmethod
+    def load(cls, path: str) -> "CollaborativeFilteringModel":
+        data = np.load(path)
+        factors, regularization, iterations, seed = data["config"]
+        model = cls(int(factors), float(regularization), int(iterations), int(seed))
+        model.mean = float(data["mean"])
+        model.movie_ids = data["movie_ids"]
+        model.movie_index = {int(m): i for i, m in enumerate(model.movie_ids)}
+        model.movie_factors = data["movie_factors"]
+        model.user_index = {str(u): i for i, u in enumerate(data["usernames"])}
+        model.user_factors = data["user_factors"]
+        return model
+
+    def _user_vector(self, username: str) -> Optional[np.ndarray]:
+        if username in self._folded:
+            return self._folded[username]
+        if username in self.user_index:
+            return self.user_factors[self.user_index[username]]
+        return None
+
+    @staticmethod
+    def _group(rows: np.ndarray, cols: np.ndarray, values: np.ndarray, count: int) -> List[tuple]:
+        """Split COO entries into per-row (cols, values) pairs"""
+        order = np.argsort(rows, kind="stable")
+        bounds = np.searchsorted(rows[order], np.arange(count + 1))
+        cols, values = cols[order], values[order]
+        return [(cols[bounds[i]:bounds[i + 1]], values[bounds[i]:bounds[i + 1]]) for i in range(count)]
+
+    def _solve_all(self, fixed: np.ndarray, groups: List[tuple]) -> np.ndarray:
+        return np.array([self._solve(fixed, cols, values) for cols, values in groups]).reshape(-1, self.factors)
+
+    def _solve(self, fixed: np.ndarray, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Regularized least squares for one user or movie"""
+        if not len(cols):
+            return np.zeros(self.factors)
+        observed = fixed[cols]
+        gram = observed.T @ observed + self.regularization * len(cols) * np.eye(self.factors)
+        return np.linalg.solve(gram, observed.T @ values)
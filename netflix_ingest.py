@@ -0,0 +1,62 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Columns of a CSV event file; rating is empty for watch events and
+# watched_date/completion_percentage are empty for rate events.
+CSV_FIELDS = ["type", "username", "movie_id", "rating", "watched_date", "completion_percentage"]
+
+
+def read_events(path: str) -> Iterator[Dict]:
+    """Stream watch/rate events from a .jsonl or .csv file"""
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Passed through so it is counted as a malformed reject
+                    yield {"raw": line}
+
+
+def chunked(events: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Split an event stream into lists of at most chunk_size events"""
+    iterator = iter(events)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_event(event: Dict) -> Optional[Dict]:
+    """Normalize field types of a raw event; None if it cannot be parsed"""
+    try:
+        parsed = {"type": event["type"], "username": str(event["username"]), "movie_id": int(event["movie_id"])}
+        if parsed["type"] == "rate":
+            parsed["rating"] = float(event["rating"])
+        elif parsed["type"] == "watch":
+            watched_date = event.get("watched_date")
+            if isinstance(watched_date, str):
+                watched_date = datetime.fromisoformat(watched_date)
+            elif isinstance(watched_date, (int, float)):
+                watched_date = datetime.fromtimestamp(watched_date)
+            elif watched_date is None:
+                watched_date = datetime.now()
+            if not isinstance(watched_date, datetime):
+                return None
+            parsed["watched_date"] = watched_date
+            parsed["completion_percentage"] = int(event.get("completion_percentage", 100))
+        else:
+            return None
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        # OverflowError and OSError come from infinite ids or out-of-range timestamps
+        return None
+    return parsed
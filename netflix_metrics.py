@@ -0,0 +1,199 @@
+import bisect
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile.
+
+        Like Prometheus' histogram_quantile, a quantile in the +Inf bucket is
+        reported as the highest finite bound, which keeps snapshots valid JSON.
+        """
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return self.bounds[-1] if self.count else 0.0
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs, each counting every observation at or below le"""
+        pairs, total = [], 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            pairs.append((repr(bound), total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class Instrumentation:
+    """Latency histograms, per-request counts and slow-request profiles for a recommender.
+
+    Nothing here runs unless the recommender's instrumentation is enabled:
+    enabling wraps the public methods on the instance, and disabling removes
+    the wrappers again. With slow_threshold set, a profile_sample_rate share
+    of calls runs under cProfile; the profiles of those that take longer
+    than slow_threshold seconds are kept, up to max_profiles. Only one call
+    is profiled at a time, since CPython allows one active profiler per
+    process from 3.12 on; calls sampled meanwhile are only timed.
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = None, profile_sample_rate: float = 0.05,
+                 max_profiles: int = 20):
+        self.slow_threshold = slow_threshold
+        self.profile_sample_rate = profile_sample_rate
+        self.slow_profiles: deque = deque(maxlen=max_profiles)
+        self.started = time.time()
+        self._calls: Dict[Tuple[str, str], Histogram] = {}
+        self._phases: Dict[Tuple[str, str], Histogram] = {}
+        self._counts: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        # Held while a sampled call runs under the profiler, including its nested calls
+        self._profiling = threading.Lock()
+        self.gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def wrap(self, name: str, method: Callable, label: Optional[Callable] = None) -> Callable:
+        """method timed into the calls histogram, labelled by label(*args, **kwargs)"""
+        @wraps(method)
+        def instrumented(*args, **kwargs):
+            key = (name, label(*args, **kwargs) if label else "")
+            if self.slow_threshold is not None and random.random() < self.profile_sample_rate \
+                    and self._profiling.acquire(blocking=False):
+                return self._profiled(key, method, args, kwargs)
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._observe(self._calls, key, time.perf_counter() - started)
+        return instrumented
+
+    def phase(self, name: str, label: str, seconds: float) -> None:
+        """Time spent in one step of a call, e.g. ("rank", "for_you")"""
+        self._observe(self._phases, (name, label), seconds)
+
+    def count(self, name: str, label: str, value: float) -> None:
+        """Per-request quantity, e.g. ("candidates", "for_you", 300)"""
+        with self._lock:
+            totals = self._counts.setdefault((name, label), [0, 0.0])
+            totals[0] += 1
+            totals[1] += value
+
+    def snapshot(self) -> Dict:
+        """Current metrics as plain data"""
+        with self._lock:
+            calls = {self._key(key): self._summary(histogram) for key, histogram in self._calls.items()}
+            phases = {self._key(key): self._summary(histogram) for key, histogram in self._phases.items()}
+            counts = {self._key(key): {"requests": n, "total": total, "mean": total / n if n else 0.0}
+                      for key, (n, total) in self._counts.items()}
+            profiles = list(self.slow_profiles)
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "calls": calls,
+            "phases": phases,
+            "counts": counts,
+            "gauges": {name: read() for name, read in self.gauges.items()},
+            "slow_requests": profiles,
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            self._histogram_lines(lines, "netflix_call_duration_seconds", "Latency of recommender calls",
+                                  ("method", "type"), self._calls)
+            self._histogram_lines(lines, "netflix_phase_duration_seconds", "Latency of steps inside a call",
+                                  ("phase", "type"), self._phases)
+            names = sorted({name for name, _ in self._counts})
+            for name in names:
+                metric = f"netflix_{name}_per_request"
+                lines.append(f"# HELP {metric} {name.capitalize()} per request")
+                lines.append(f"# TYPE {metric} summary")
+                for (count_name, label), (n, total) in sorted(self._counts.items()):
+                    if count_name == name:
+                        lines.append(f'{metric}_sum{{type="{label}"}} {total}')
+                        lines.append(f'{metric}_count{{type="{label}"}} {n}')
+            slow = len(self.slow_profiles)
+        for name, read in self.gauges.items():
+            metric = f"netflix_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for field, value in read().items():
+                lines.append(f'{metric}{{field="{field}"}} {value}')
+        lines.append("# TYPE netflix_slow_requests_profiled gauge")
+        lines.append(f"netflix_slow_requests_profiled {slow}")
+        return "\n".join(lines) + "\n"
+
+    def _profiled(self, key: Tuple[str, str], method: Callable, args, kwargs):
+        """Run method under cProfile; the caller has acquired self._profiling"""
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            return profiler.runcall(method, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._profiling.release()
+            self._observe(self._calls, key, elapsed)
+            if elapsed >= self.slow_threshold:
+                report = io.StringIO()
+                pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(25)
+                with self._lock:
+                    self.slow_profiles.append({"call": self._key(key), "seconds": elapsed,
+                                               "at": time.time(), "profile": report.getvalue()})
+
+    def _observe(self, histograms: Dict, key: Tuple[str, str], seconds: float) -> None:
+        with self._lock:
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @staticmethod
+    def _key(key: Tuple[str, str]) -> str:
+        name, label = key
+        return f"{name}:{label}" if label else name
+
+    @staticmethod
+    def _summary(histogram: Histogram) -> Dict:
+        return {
+            "count": histogram.count,
+            "sum_seconds": histogram.sum,
+            "mean_seconds": histogram.sum / histogram.count if histogram.count else 0.0,
+            "p50_seconds": histogram.quantile(0.5),
+            "p99_seconds": histogram.quantile(0.99),
+            "buckets": dict(histogram.cumulative()),
+        }
+
+    @staticmethod
+    def _histogram_lines(lines: List[str], metric: str, help_text: str, label_names: Tuple[str, str],
+                         histograms: Dict) -> None:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, label), histogram in sorted(histograms.items()):
+            labels = f'{label_names[0]}="{name}"' + (f',{label_names[1]}="{label}"' if label else "")
+            for le, count in histogram.cumulative():
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
@@ -1,19 +1,830 @@
+import bisect
+import hashlib
+import heapq
 import json
 import random
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 import math
+import os
+import re
+import threading
+
+from netflix_cache import RecommendationCache
+from netflix_ingest import chunked, parse_event, read_events
+from netflix_metrics import Instrumentation
+from netflix_preferences import PreferenceVector, rating_value, watch_value
+from netflix_records import MovieRecord, ViewingHistory
+from netflix_stats import UserStats
+from netflix_storage import LazyUserMap, StorageBackend
+from netflix_trending import TrendingEngine
+
+RECOMMENDATION_TYPES = ("for_you", "because_you_watched", "top_picks", "trending_now", "new_releases", "collaborative")
+
+# Upper bound on catalog x user score cells held in memory by one batch chunk
+BATCH_SCORE_BUDGET = 1 << 24
+
+# How far in the future an ingested watch may be dated, for clock skew between sources
+CLOCK_SKEW_SECONDS = 300
+
+try:
+    import numpy as np
+    from netflix_ann import IVFIndex
+    from netflix_collaborative import CollaborativeFilteringModel
+except ImportError:  # NumPy is optional; scoring falls back to pure Python
+    np = None
+    IVFIndex = None
+    CollaborativeFilteringModel = None
+
+def recommendation_type_label(*args, **kwargs) -> str:
+    """Metrics label for a get_recommendations(_batch) call: its type, counting unknown types as for_you.
+
+    Takes the call's arguments as given, positional or keyword, and never
+    raises, so a call that is wrong in itself fails the same way unwrapped.
+    """
+    recommendation_type = args[1] if len(args) > 1 else kwargs.get("recommendation_type", "for_you")
+    return recommendation_type if recommendation_type in RECOMMENDATION_TYPES else "for_you"
+
+
+# Public methods timed while instrumentation is enabled, with their label function
+INSTRUMENTED_METHODS = {
+    "get_recommendations": recommendation_type_label,
+    "get_recommendations_batch": recommendation_type_label,
+    "get_trending_movies": None,
+    "get_new_releases": None,
+    "search_movies": None,
+    "get_user_stats": None,
+    "get_watch_time": None,
+    "create_user_profile": None,
+    "update_user_profile": None,
+    "add_to_watchlist": None,
+    "remove_from_watchlist": None,
+    "watch_movie": None,
+    "rate_movie": None,
+    "ingest_events": None,
+}
+
+
+class StripedLock:
+    """Fixed pool of locks shared out by key hash, so different users rarely contend"""
+    
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+    
+    def lock_for(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+
+def movie_similarity(movie: Dict, other: Dict) -> float:
+    """Content similarity used for "because you watched" recommendations"""
+    similarity_score = 0
+    
+    # Same genre
+    common_genres = set(movie["genre"]) & set(other["genre"])
+    similarity_score += len(common_genres) * 2
+    
+    # Similar tags
+    common_tags = set(movie.get("tags", [])) & set(other.get("tags", []))
+    similarity_score += len(common_tags)
+    
+    # Similar category
+    if movie["category"] == other["category"]:
+        similarity_score += 1
+    
+    # Similar year (within 5 years)
+    if abs(movie["year"] - other["year"]) <= 5:
+        similarity_score += 0.5
+    
+    return similarity_score
+
+class MovieCatalog:
+    """Movie collection with an id index and secondary indexes by genre, category, year and tag.
+    
+    The catalog is shared read-only by all threads while serving; edits are
+    serialized but are meant to be applied between serving periods.
+    """
+
+    def __init__(self, movies: Optional[List[Dict]] = None):
+        self._by_id: Dict[int, Dict] = {}
+        self._position: Dict[int, int] = {}
+        self._by_genre: Dict[str, Dict[int, Dict]] = {}
+        self._by_category: Dict[str, Dict[int, Dict]] = {}
+        self._by_year: Dict[int, Dict[int, Dict]] = {}
+        self._by_tag: Dict[str, Dict[int, Dict]] = {}
+        # (kind, key) -> (catalog version, depth, highest rated movies of that genre or category)
+        self._top_rated: Dict[Tuple[str, str], Tuple[int, int, List[Dict]]] = {}
+        # (catalog version, negated ratings ascending, movies in that order)
+        self._by_rating: Optional[Tuple[int, List[float], List[Dict]]] = None
+        self._columns = None
+        self._fingerprint: Optional[Tuple[int, str]] = None
+        self._listeners: List = []
+        self._write_lock = threading.RLock()
+        self.version = 0
+        for movie in movies or []:
+            self.add(movie)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self._by_id
+
+    def get(self, movie_id: int) -> Optional[Dict]:
+        """Look up a movie by id"""
+        return self._by_id.get(movie_id)
+
+    def position(self, movie_id: int) -> int:
+        """Insertion order of a movie in the catalog"""
+        return self._position[movie_id]
+
+    def add(self, movie: Dict) -> None:
+        """Add a movie, replacing any existing movie with the same id"""
+        movie = MovieRecord.of(movie)
+        with self._write_lock:
+            movie_id = movie["id"]
+            previous = self._by_id.get(movie_id)
+            if previous is not None:
+                self._unindex(previous)
+            else:
+                self._position[movie_id] = len(self._position)
+            self._by_id[movie_id] = movie
+            self._index(movie)
+            self.version += 1
+            for listener in self._listeners:
+                listener(movie, previous)
+    
+    def subscribe(self, listener) -> None:
+        """Call listener(movie, previous) whenever a movie is added or edited"""
+        self._listeners.append(listener)
+
+    def update(self, movie_id: int, **fields) -> Dict:
+        """Edit fields of an existing movie and refresh its index entries"""
+        with self._write_lock:
+            movie = MovieRecord(dict(self._by_id[movie_id], **fields, id=movie_id))
+            self.add(movie)
+        return movie
+
+    def fingerprint(self) -> str:
+        """Digest of every movie's data, for telling whether a saved index still matches the catalog"""
+        with self._write_lock:
+            if self._fingerprint is None or self._fingerprint[0] != self.version:
+                digest = hashlib.sha256()
+                for movie_id in sorted(self._by_id):
+                    digest.update(json.dumps(dict(self._by_id[movie_id]), sort_keys=True).encode())
+                self._fingerprint = (self.version, digest.hexdigest())
+            return self._fingerprint[1]
+    
+    def columns(self) -> "ColumnarCatalog":
+        """Columnar NumPy view of the catalog, rebuilt only after the catalog changes"""
+        if self._columns is None or self._columns.version != self.version:
+            self._columns = ColumnarCatalog(self)
+        return self._columns
+
+    def by_genre(self, genre: str) -> List[Dict]:
+        return list(self._by_genre.get(genre, {}).values())
+
+    def by_category(self, category: str) -> List[Dict]:
+        return list(self._by_category.get(category, {}).values())
+
+    def by_year(self, year: int) -> List[Dict]:
+        return list(self._by_year.get(year, {}).values())
+
+    def by_tag(self, tag: str) -> List[Dict]:
+        return list(self._by_tag.get(tag, {}).values())
+
+    def top_rated(self, k: int, genre: Optional[str] = None, category: Optional[str] = None) -> List[Dict]:
+        """Highest rated movies of a genre, else of a category, best first.
+        
+        Each list is ranked once per catalog version, deep enough for later calls,
+        so repeated calls cost O(k).
+        """
+        key = ("genre", genre) if genre is not None else ("category", category)
+        cached = self._top_rated.get(key)
+        if cached is None or cached[0] != self.version or cached[1] < k:
+            version = self.version
+            index = self._by_genre if genre is not None else self._by_category
+            depth = max(k, 64)
+            ranked = heapq.nlargest(depth, list(index.get(key[1], {}).values()), key=lambda m: m["rating"])
+            cached = self._top_rated[key] = (version, depth, ranked)
+        return cached[2][:k]
+    
+    def years(self) -> List[int]:
+        """Release years present in the catalog"""
+        return list(self._by_year)
+    
+    def index_size(self, kind: str, key) -> int:
+        """Number of movies under key in the "genre", "category" or "year" index"""
+        index = {"genre": self._by_genre, "category": self._by_category, "year": self._by_year}[kind]
+        return len(index.get(key, ()))
+    
+    def count_rated_at_least(self, rating: float) -> int:
+        return bisect.bisect_right(self._rating_order()[0], -rating)
+    
+    def rated_at_least(self, rating: float) -> List[Dict]:
+        """Movies rated at least rating, best first; the ordering is sorted once per catalog version"""
+        keys, movies = self._rating_order()
+        return movies[:bisect.bisect_right(keys, -rating)]
+    
+    def _rating_order(self) -> Tuple[List[float], List[Dict]]:
+        cached = self._by_rating
+        if cached is None or cached[0] != self.version:
+            version = self.version
+            movies = sorted(self._by_id.values(), key=lambda m: m["rating"], reverse=True)
+            cached = self._by_rating = (version, [-m["rating"] for m in movies], movies)
+        return cached[1], cached[2]
+
+    def released_since(self, min_year: int) -> List[Dict]:
+        """Movies from min_year onwards, in catalog order"""
+        movies = [m for year, bucket in self._by_year.items() if year >= min_year for m in bucket.values()]
+        movies.sort(key=lambda m: self._position[m["id"]])
+        return movies
+
+    def _index(self, movie: Dict) -> None:
+        movie_id = movie["id"]
+        for genre in movie["genre"]:
+            self._by_genre.setdefault(genre, {})[movie_id] = movie
+        for tag in movie.get("tags", []):
+            self._by_tag.setdefault(tag, {})[movie_id] = movie
+        self._by_category.setdefault(movie["category"], {})[movie_id] = movie
+        self._by_year.setdefault(movie["year"], {})[movie_id] = movie
+
+    def _unindex(self, movie: Dict) -> None:
+        movie_id = movie["id"]
+        buckets = [(self._by_genre, g) for g in movie["genre"]]
+        buckets += [(self._by_tag, t) for t in movie.get("tags", [])]
+        buckets += [(self._by_category, movie["category"]), (self._by_year, movie["year"])]
+        for index, key in buckets:
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(movie_id, None)
+                if not bucket:
+                    del index[key]
+
+
+class ColumnarCatalog:
+    """Struct-of-arrays snapshot of a MovieCatalog for vectorized scoring"""
+
+    def __init__(self, catalog: MovieCatalog):
+        movies = list(catalog)
+        self.version = catalog.version
+        self.movies = movies
+        self.row_of = {m["id"]: row for row, m in enumerate(movies)}
+        self.ids = np.array([m["id"] for m in movies], dtype=np.int64)
+        self.rating = np.array([m["rating"] for m in movies], dtype=np.float64)
+        self.duration = np.array([m["duration"] for m in movies], dtype=np.float64)
+        self.year = np.array([m["year"] for m in movies], dtype=np.int64)
+        
+        self.categories = list(dict.fromkeys(m["category"] for m in movies))
+        self.category_index = {category: code for code, category in enumerate(self.categories)}
+        self.category_code = np.array([self.category_index[m["category"]] for m in movies], dtype=np.int32)
+        
+        self.genres = sorted({g for m in movies for g in m["genre"]})
+        self.genre_index = {genre: col for col, genre in enumerate(self.genres)}
+        # Multi-hot genre matrix (genres are unique within a movie)
+        self.genre_matrix = np.zeros((len(movies), len(self.genres)), dtype=np.float64)
+        for row, movie in enumerate(movies):
+            for genre in movie["genre"]:
+                self.genre_matrix[row, self.genre_index[genre]] = 1
+        
+        tag_rows: Dict[str, List[int]] = {}
+        for row, movie in enumerate(movies):
+            for tag in set(movie.get("tags", [])):
+                tag_rows.setdefault(tag, []).append(row)
+        self.tag_rows = {tag: np.array(rows, dtype=np.int64) for tag, rows in tag_rows.items()}
+    
+    def __len__(self) -> int:
+        return len(self.movies)
+    
+    def category_code_of(self, category: str) -> int:
+        return self.category_index.get(category, -1)
+    
+    def content_vectors(self) -> Tuple[List[str], "np.ndarray"]:
+        """Named dimensions and per-movie vectors: genre multi-hot, category one-hot, rating / 10 and recent (2020+)"""
+        dimensions = [f"genre:{g}" for g in self.genres] + [f"category:{c}" for c in self.categories]
+        dimensions += ["rating", "recent"]
+        category_one_hot = np.zeros((len(self.movies), len(self.categories)))
+        category_one_hot[np.arange(len(self.movies)), self.category_code] = 1
+        vectors = np.hstack([self.genre_matrix, category_one_hot, self.rating[:, None] / 10,
+                             (self.year >= 2020)[:, None]])
+        return dimensions, vectors
+    
+    def genre_vector(self, genres: List[str]) -> "np.ndarray":
+        """Multi-hot vector over the genre vocabulary"""
+        vector = np.zeros(len(self.genres))
+        for genre in genres:
+            if genre in self.genre_index:
+                vector[self.genre_index[genre]] = 1
+        return vector
+    
+    def rows_of(self, movie_ids) -> "np.ndarray":
+        """Row numbers of the given movie ids; ids not in the snapshot are skipped"""
+        return np.array([self.row_of[movie_id] for movie_id in movie_ids if movie_id in self.row_of], dtype=np.int64)
+    
+    def unwatched_mask(self, watched_ids) -> "np.ndarray":
+        """Boolean mask of rows whose movie id is not in watched_ids"""
+        mask = np.ones(len(self), dtype=bool)
+        mask[self.rows_of(watched_ids)] = False
+        return mask
+    
+    def rank_batch(self, scores: "np.ndarray", eligible: Optional["np.ndarray"], k: int,
+                   watched_rows: List["np.ndarray"]) -> List["np.ndarray"]:
+        """Top k rows per column of a catalog x user score matrix, skipping each user's watched rows"""
+        ranked = []
+        for j, rows in enumerate(watched_rows):
+            mask = np.ones(len(self), dtype=bool)
+            mask[rows] = False
+            if eligible is not None:
+                mask &= eligible if eligible.ndim == 1 else eligible[:, j]
+            ranked.append(self.top_k_rows(scores[:, j], k, mask))
+        return ranked
+    
+    def top_k(self, scores: "np.ndarray", k: int, mask: Optional["np.ndarray"] = None) -> List[Dict]:
+        """Highest scoring movies, ties broken by catalog order like a stable sort"""
+        return [self.movies[row] for row in self.top_k_rows(scores, k, mask)]
+    
+    def top_k_rows(self, scores: "np.ndarray", k: int, mask: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """Row numbers of the highest scoring movies, in rank order"""
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+        if len(rows) > k > 0:
+            candidate_scores = scores[rows]
+            kth = candidate_scores[np.argpartition(-candidate_scores, k - 1)[k - 1]]
+            rows = rows[candidate_scores >= kth]
+        order = np.lexsort((rows, -scores[rows]))[:k]
+        return rows[order]
+    
+    def similarity_row(self, row: int) -> "np.ndarray":
+        """movie_similarity of one movie against every movie in the catalog"""
+        movie = self.movies[row]
+        scores = 2 * (self.genre_matrix @ self.genre_matrix[row])
+        for tag in set(movie.get("tags", [])):
+            scores[self.tag_rows[tag]] += 1
+        scores += self.category_code == self.category_code[row]
+        scores += 0.5 * (np.abs(self.year - self.year[row]) <= 5)
+        return scores
+
+
+def preference_scores(weights: List[Dict[str, float]], columns: ColumnarCatalog) -> "np.ndarray":
+    """Catalog x user dot products of movie features with each user's preference weights"""
+    genre_weights = np.array([[w.get(f"genre:{genre}", 0.0) for w in weights] for genre in columns.genres])
+    category_weights = np.array([[w.get(f"category:{category}", 0.0) for w in weights]
+                                 for category in columns.categories])
+    scores = columns.genre_matrix @ genre_weights.reshape(len(columns.genres), len(weights))
+    scores += category_weights.reshape(len(columns.categories), len(weights))[columns.category_code]
+    for j, user_weights in enumerate(weights):
+        for name, weight in user_weights.items():
+            if name.startswith("tag:") and name[4:] in columns.tag_rows:
+                scores[columns.tag_rows[name[4:]], j] += weight
+    return scores
+
+
+def score_for_you(users: List[Dict], columns: ColumnarCatalog):
+    """Catalog x user "for you" scores for a chunk of {"profile", "weights"} inputs"""
+    profiles = [user["profile"] for user in users]
+    scores = preference_scores([user["weights"] for user in users], columns)
+    
+    rating_range = np.array([p["preferred_rating_range"] for p in profiles], dtype=np.float64)
+    duration_range = np.array([p["preferred_duration_range"] for p in profiles], dtype=np.float64)
+    rating = columns.rating[:, None]
+    duration = columns.duration[:, None]
+    scores += 2 * ((rating >= rating_range[:, 0]) & (rating <= rating_range[:, 1]))
+    scores += (duration >= duration_range[:, 0]) & (duration <= duration_range[:, 1])
+    
+    # Movie-only boosts are shared by every user
+    boost = 0.5 * (columns.category_code == columns.category_code_of("Netflix Original"))
+    boost += columns.year >= 2020
+    scores += boost[:, None]
+    return scores, None, 10
+
+
+def score_top_picks(users: List[Dict], columns: ColumnarCatalog):
+    """Catalog x user "top picks" scores for a chunk of {"profile", "weights"} inputs"""
+    # Scaled so that a favorite genre adds one rating point
+    scores = preference_scores([user["weights"] for user in users], columns) / 3 + columns.rating[:, None]
+    return scores, columns.rating >= 8.0, 8
+
+
+def score_because_you_watched(recent_movies: List[Dict], columns: ColumnarCatalog):
+    """Catalog x user similarity to each user's most recently watched movie"""
+    recent_genres = np.stack([columns.genre_vector(m["genre"]) for m in recent_movies], axis=1)
+    scores = 2 * (columns.genre_matrix @ recent_genres)
+    
+    recent_category = np.array([columns.category_code_of(m["category"]) for m in recent_movies])
+    recent_year = np.array([m["year"] for m in recent_movies])
+    scores += columns.category_code[:, None] == recent_category
+    scores += 0.5 * (np.abs(columns.year[:, None] - recent_year) <= 5)
+    
+    for j, movie in enumerate(recent_movies):
+        for tag in set(movie.get("tags", [])):
+            scores[columns.tag_rows.get(tag, []), j] += 1
+    return scores, scores > 0, 8
+
+
+# Batch scorers by recommendation type; each returns (scores, eligible mask, result count)
+BATCH_SCORERS = {
+    "for_you": score_for_you,
+    "because_you_watched": score_because_you_watched,
+    "top_picks": score_top_picks,
+}
+
+
+class ItemSimilarityIndex:
+    """Top-K most similar movies per movie, kept current as the catalog changes.
+    
+    The index is empty until build() or load() is called. Building is quadratic
+    in the catalog size, so it is an explicit step, e.g. at startup; lookups
+    never trigger it and report nothing until it is done.
+    """
+    
+    def __init__(self, catalog: MovieCatalog, k: int = 50):
+        self.catalog = catalog
+        self.k = k
+        self._neighbours: Optional[Dict[int, List[Tuple[float, int]]]] = None
+        # Serializes builds, loads and incremental updates
+        self._lock = threading.Lock()
+        catalog.subscribe(self._on_catalog_change)
+    
+    @property
+    def ready(self) -> bool:
+        return self._neighbours is not None
+    
+    def neighbours(self, movie_id: int) -> List[Tuple[Dict, float]]:
+        """Most similar movies to movie_id with their scores, best first; empty until the index is ready"""
+        neighbours = self._neighbours or {}
+        return [(self.catalog.get(other_id), score) for score, other_id in neighbours.get(movie_id, [])]
+    
+    def is_complete(self, movie_id: int) -> bool:
+        """Whether the neighbour list holds every movie with a positive similarity"""
+        neighbours = self._neighbours
+        return neighbours is not None and len(neighbours.get(movie_id, [])) < self.k
+    
+    def build(self) -> None:
+        """Compute neighbour lists for the whole catalog"""
+        with self._lock:
+            if np is None:
+                self._neighbours = {movie["id"]: self._scan(movie) for movie in self.catalog}
+                return
+            
+            # Published only once complete, so concurrent readers never see a partial index
+            columns = self.catalog.columns()
+            neighbours = {}
+            for row, movie in enumerate(columns.movies):
+                scores = columns.similarity_row(row)
+                mask = scores > 0
+                mask[row] = False
+                top_rows = columns.top_k_rows(scores, self.k, mask)
+                neighbours[movie["id"]] = [(float(scores[r]), int(columns.ids[r])) for r in top_rows]
+            self._neighbours = neighbours
+    
+    def save(self, path: str) -> None:
+        """Write the neighbour lists to a JSON file, building them first if needed"""
+        if self._neighbours is None:
+            self.build()
+        with self._lock:
+            with open(path, "w") as f:
+                json.dump({"k": self.k, "catalog": self.catalog.fingerprint(),
+                           "neighbours": {str(movie_id): neighbours
+                                                       for movie_id, neighbours in self._neighbours.items()}}, f)
+    
+    def load(self, path: str) -> bool:
+        """Read neighbour lists written by save(); False, leaving the index unchanged, if the catalog differs"""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("catalog") != self.catalog.fingerprint():
+            return False
+        with self._lock:
+            self.k = data["k"]
+            self._neighbours = {int(movie_id): [(score, other_id) for score, other_id in neighbours]
+                                for movie_id, neighbours in data["neighbours"].items()}
+        return True
+    
+    def _scan(self, movie: Dict) -> List[Tuple[float, int]]:
+        """Exact top-K neighbours of one movie by scanning the catalog"""
+        scored = [(movie_similarity(other, movie), other["id"]) for other in self.catalog if other["id"] != movie["id"]]
+        scored = [entry for entry in scored if entry[0] > 0]
+        scored.sort(key=self._rank)
+        return scored[:self.k]
+    
+    def _rank(self, entry: Tuple[float, int]) -> Tuple[float, int]:
+        return -entry[0], self.catalog.position(entry[1])
+    
+    def _on_catalog_change(self, movie: Dict, previous: Optional[Dict]) -> None:
+        with self._lock:
+            if self._neighbours is not None:
+                self._update(movie)
+    
+    def _update(self, movie: Dict) -> None:
+        movie_id = movie["id"]
+        self._neighbours[movie_id] = self._scan(movie)
+        for other in self.catalog:
+            other_id = other["id"]
+            if other_id == movie_id:
+                continue
+            neighbours = self._neighbours.setdefault(other_id, [])
+            was_full = len(neighbours) >= self.k
+            had_movie = any(entry[1] == movie_id for entry in neighbours)
+            neighbours[:] = [entry for entry in neighbours if entry[1] != movie_id]
+            
+            score = movie_similarity(other, movie)
+            if score > 0:
+                neighbours.append((score, movie_id))
+                neighbours.sort(key=self._rank)
+                del neighbours[self.k:]
+            if had_movie and was_full and (len(neighbours) < self.k or neighbours[-1][1] == movie_id):
+                # The edited movie fell to the cut-off, so a movie outside the list may now outrank it
+                self._neighbours[other_id] = self._scan(other)
+
+
+class SearchIndex:
+    """Inverted n-gram index over title, genre and tag text for substring search.
+    
+    Posting lists hold movie ids in catalog order, so a search walks one list
+    lazily and stops as soon as it has enough results. When a filter selects
+    fewer movies than that list holds, the search walks the filter's index
+    bucket instead.
+    """
+    
+    GRAM_SIZE = 3
+    
+    def __init__(self, catalog: MovieCatalog):
+        self.catalog = catalog
+        self._texts: Dict[int, List[str]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for movie in catalog:
+            self._add(movie, appended=True)
+        catalog.subscribe(self._on_catalog_change)
+    
+    def search(self, query: str, filters: Optional[Dict] = None, limit: int = 20) -> List[Dict]:
+        """Movies containing query in their title, a genre or a tag.
+        
+        Matches at the start of a word rank ahead of matches inside a word; each group
+        keeps catalog order.
+        """
+        query = query.lower()
+        word_start = re.compile(r"(?<!\w)" + re.escape(query))
+        ranked, inner_matches = [], []
+        candidates, exact = self._candidates(query)
+        if filters:
+            size = len(candidates) if isinstance(candidates, list) else len(self.catalog)
+            bucket = self._filter_bucket(filters, size, limit)
+            if bucket is not None:
+                candidates, exact = bucket, False
+        for movie_id in candidates:
+            texts = self._texts[movie_id]
+            if not exact and not any(query in text for text in texts):
+                continue
+            movie = self.catalog.get(movie_id)
+            if filters and not self._matches_filters(movie, filters):
+                continue
+            if any(word_start.search(text) for text in texts):
+                ranked.append(movie)
+                if len(ranked) >= limit:
+                    break
+            elif len(inner_matches) < limit:
+                inner_matches.append(movie)
+        return (ranked + inner_matches)[:limit]
+    
+    def _candidates(self, query: str) -> Tuple[Iterable[int], bool]:
+        """Ids of movies that may contain query, in catalog order, and whether they all do"""
+        if not query:
+            return (movie["id"] for movie in self.catalog), True
+        if len(query) <= self.GRAM_SIZE:
+            return self._postings.get(query, []), True
+        # The rarest gram's list is the shortest superset; callers check the full query
+        return min((self._postings.get(gram, []) for gram in self._grams(query, self.GRAM_SIZE)), key=len), False
+    
+    def _filter_bucket(self, filters: Dict, candidates: int, limit: int) -> Optional[List[int]]:
+        """Ids, in catalog order, of the smallest index bucket covering one filter, when walking it is cheaper"""
+        catalog = self.catalog
+        buckets = []
+        if "category" in filters:
+            buckets.append((catalog.index_size("category", filters["category"]),
+                            lambda: catalog.by_category(filters["category"])))
+        if "genre" in filters:
+            buckets.append((sum(catalog.index_size("genre", genre) for genre in filters["genre"]),
+                            lambda: [m for genre in filters["genre"] for m in catalog.by_genre(genre)]))
+        if "year_range" in filters:
+            min_year, max_year = filters["year_range"]
+            years = [year for year in catalog.years() if min_year <= year <= max_year]
+            buckets.append((sum(catalog.index_size("year", year) for year in years),
+                            lambda: [m for year in years for m in catalog.by_year(year)]))
+        if "rating_min" in filters:
+            buckets.append((catalog.count_rated_at_least(filters["rating_min"]),
+                            lambda: catalog.rated_at_least(filters["rating_min"])))
+        if not buckets:
+            return None
+        size, movies = min(buckets, key=lambda bucket: bucket[0])
+        # The bucket is read whole, while the lazy candidate walk meets about size / len(catalog)
+        # matches per entry, so a broad filter is cheaper to check per candidate
+        if size >= min(candidates, 4 * limit * len(catalog) / max(size, 1)):
+            return None
+        return sorted({movie["id"] for movie in movies()}, key=catalog.position)
+    
+    @staticmethod
+    def _matches_filters(movie: Dict, filters: Dict) -> bool:
+        if "genre" in filters and not any(genre in movie["genre"] for genre in filters["genre"]):
+            return False
+        if "category" in filters and movie["category"] != filters["category"]:
+            return False
+        if "year_range" in filters:
+            min_year, max_year = filters["year_range"]
+            if not min_year <= movie["year"] <= max_year:
+                return False
+        return "rating_min" not in filters or movie["rating"] >= filters["rating_min"]
+    
+    @staticmethod
+    def _grams(text: str, size: int) -> set:
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+    
+    def _movie_grams(self, texts: List[str]) -> set:
+        return {gram for text in texts for size in range(1, self.GRAM_SIZE + 1) for gram in self._grams(text, size)}
+    
+    def _add(self, movie: Dict, appended: bool) -> None:
+        """Index a movie; appended means it comes after every movie indexed so far in catalog order"""
+        movie_id = movie["id"]
+        texts = [movie["title"].lower()] + [g.lower() for g in movie["genre"]] + [t.lower() for t in movie.get("tags", [])]
+        self._texts[movie_id] = texts
+        for gram in self._movie_grams(texts):
+            posting = self._postings.setdefault(gram, [])
+            if appended:
+                posting.append(movie_id)
+            else:
+                bisect.insort(posting, movie_id, key=self.catalog.position)
+    
+    def _remove(self, movie_id: int) -> None:
+        for gram in self._movie_grams(self._texts.pop(movie_id)):
+            posting = self._postings[gram]
+            posting.remove(movie_id)
+            if not posting:
+                del self._postings[gram]
+    
+    def _on_catalog_change(self, movie: Dict, previous: Optional[Dict]) -> None:
+        # New movies go to the end of the catalog; an edited movie keeps its position
+        if previous is not None:
+            self._remove(movie["id"])
+        self._add(movie, appended=previous is None)
+
 
 class NetflixMovieRecommender:
-    def __init__(self):
-        self.movies = self._initialize_movie_database()
-        self.user_profiles = {}
-        self.viewing_history = {}
-        self.ratings = {}
-        self.watchlist = {}
-        self.trending_movies = []
-        self.new_releases = []
-        self._generate_trending_and_new()
+    def __init__(self, vectorized: bool = True, storage: Optional[StorageBackend] = None, quiet: bool = False):
+        # Quiet mode only returns status codes, for use behind a server
+        self.quiet = quiet
+        self.storage = storage or StorageBackend()
+        self.movies = MovieCatalog(self._load_catalog())
+        self.movies.subscribe(lambda movie, previous: self.storage.save_movie(movie))
+        self.vectorized = vectorized and np is not None
+        self.similar_movies = ItemSimilarityIndex(self.movies)
+        self.search_index = SearchIndex(self.movies)
+        
+        # Per-user state is loaded from storage the first time each user is touched.
+        # Writers hold the user's stripe lock. Readers of profiles, histories, ratings and
+        # watchlists take no locks: history lists are append-only and profile and rating
+        # dicts are replaced rather than mutated, so a reader always sees a consistent snapshot.
+        # Storage writes run after the stripe lock is released, in order under a second one.
+        self._user_locks = StripedLock()
+        self._storage_locks = StripedLock()
+        self.user_profiles = LazyUserMap(self.storage.load_profile)
+        self.viewing_history = LazyUserMap(lambda u: self._load_user_state(u, self._load_history))
+        self.ratings = LazyUserMap(lambda u: self._load_user_state(u, self.storage.load_ratings))
+        self.watchlist = LazyUserMap(lambda u: self._load_user_state(u, self.storage.load_watchlist))
+        # Running aggregates behind get_user_stats and learned preference vectors. Both are
+        # updated in place under the user's lock; stats are also read under it, while a
+        # preference vector publishes an immutable weights snapshot that is read without one
+        self.user_stats = LazyUserMap(lambda u: self._load_user_state(u, self._rebuild_stats))
+        self.preferences = LazyUserMap(lambda u: self._load_user_state(u, self._rebuild_preferences))
+        
+        # Results per (username, type), dropped when the user's events or the catalog change
+        self.recommendation_cache = RecommendationCache()
+        self.movies.subscribe(lambda movie, previous: self.recommendation_cache.clear())
+        
+        # Candidate retrieval for "for you" and "top picks" by recommendation type;
+        # built by build_ann_index() or loaded by load_ann_index()
+        self.ann_indexes: Dict[str, "IVFIndex"] = {}
+        self.ann_candidates = 300
+        
+        # Trained offline by train_collaborative_model(). Each user's events are counted, and
+        # a user whose count has moved past the one their factors were fitted to is folded
+        # in again on their next collaborative request
+        self.collaborative_model = None
+        self._user_events: Dict[str, int] = {}
+        
+        # Trending is driven by viewing events; new releases are relative to today
+        self.trending = TrendingEngine()
+        self.new_release_years = 2
+        
+        # Worker processes for catalog-wide scoring; started by start_process_pool()
+        self.process_pool = None
+        
+        # Opt-in metrics; see enable_instrumentation()
+        self.metrics: Optional[Instrumentation] = None
+    
+    def _load_catalog(self) -> List[Dict]:
+        """Load the catalog from storage, seeding it with the built-in database on first run"""
+        movies = self.storage.load_movies()
+        if not movies:
+            movies = self._initialize_movie_database()
+            for movie in movies:
+                self.storage.save_movie(movie)
+        return movies
+    
+    def _load_user_state(self, username: str, loader):
+        """Load one kind of per-user state, or None if the user has no profile"""
+        if username not in self.user_profiles:
+            return None
+        return loader(username)
+    
+    def _load_history(self, username: str) -> ViewingHistory:
+        return ViewingHistory(self.storage.load_history(username))
+    
+    def _rebuild_stats(self, username: str) -> UserStats:
+        """Aggregates for a user whose history was loaded from storage"""
+        stats = UserStats()
+        history = self.viewing_history[username]
+        for movie_id, timestamp in zip(history.movie_ids, history.timestamps):
+            movie = self.movies.get(movie_id)
+            if movie is not None:
+                stats.add_watch(movie, datetime.fromtimestamp(timestamp))
+        for rating in self.ratings[username].values():
+            stats.add_rating(rating)
+        return stats
+    
+    def _rebuild_preferences(self, username: str) -> PreferenceVector:
+        """Preference vector for a user loaded from storage; ratings count as given now"""
+        profile = self.user_profiles[username]
+        vector = PreferenceVector(profile["favorite_genres"], profile.get("disliked_genres", []))
+        history = self.viewing_history[username]
+        for movie_id, timestamp, completion in zip(history.movie_ids, history.timestamps, history.completions):
+            movie = self.movies.get(movie_id)
+            if movie is not None:
+                vector.observe(movie, watch_value(completion), datetime.fromtimestamp(timestamp), publish=False)
+        now = datetime.now()
+        for movie_id, rating in self.ratings[username].items():
+            movie = self.movies.get(movie_id)
+            if movie is not None:
+                vector.rate(movie, rating_value(rating), now, publish=False)
+        vector.publish()
+        return vector
+    
+    def _preference_weights(self, username: str) -> Dict[str, float]:
+        return self.preferences[username].weights()
+    
+    @contextmanager
+    def _user_update(self, username: str):
+        """Hold the user's lock while in-memory state changes; yields a list for storage writes.
+        
+        The writes, as callables, run after the user's lock is released, so readers
+        never wait on disk I/O, but still under the user's storage lock, so they
+        reach storage in the order the changes were made.
+        """
+        writes = []
+        with self._storage_locks.lock_for(username):
+            with self._user_locks.lock_for(username):
+                yield writes
+            for write in writes:
+                write()
+    
+    def _watched_ids(self, username: str) -> set:
+        history = self.viewing_history.get(username)
+        return history.watched_ids() if history else set()
+    
+    def _status(self, status: str, message: str) -> str:
+        """Print message unless in quiet mode, and return the status code"""
+        if not self.quiet:
+            print(message)
+        return status
+    
+    def enable_instrumentation(self, slow_threshold: Optional[float] = None,
+                               profile_sample_rate: float = 0.05) -> Instrumentation:
+        """Record latency histograms and per-request counts, and profile sampled slow calls.
+        
+        Public methods are wrapped on this instance only, so a recommender that
+        never enables instrumentation, or disables it again, runs unwrapped.
+        """
+        self.disable_instrumentation()
+        metrics = Instrumentation(slow_threshold, profile_sample_rate)
+        metrics.gauges["recommendation_cache"] = self.recommendation_cache.stats
+        metrics.gauges["user_state_loads"] = lambda: {
+            "profiles": self.user_profiles.loads, "history": self.viewing_history.loads,
+            "ratings": self.ratings.loads, "watchlist": self.watchlist.loads,
+        }
+        for name, label in INSTRUMENTED_METHODS.items():
+            setattr(self, name, metrics.wrap(name, getattr(self, name), label))
+        self.metrics = metrics
+        return metrics
+    
+    def disable_instrumentation(self) -> None:
+        for name in INSTRUMENTED_METHODS:
+            self.__dict__.pop(name, None)
+        self.metrics = None
+    
+    def close(self) -> None:
+        """Stop scoring workers, flush pending writes and release the storage backend"""
+        self.stop_process_pool()
+        self.storage.close()
     
     def _initialize_movie_database(self) -> List[Dict]:
         """Initialize a comprehensive movie database with Netflix-style categories"""
@@ -60,9 +871,9 @@ class NetflixMovieRecommender:
             {"id": 25, "title": "Forrest Gump", "genre": ["Drama", "Romance"], "year": 1994, "rating": 8.8, "duration": 142, "category": "Classic", "tags": ["life story", "historical", "inspiring"]},
         ]
     
-    def create_user_profile(self, username: str, preferences: Dict) -> None:
+    def create_user_profile(self, username: str, preferences: Dict) -> str:
         """Create a new user profile with preferences"""
-        self.user_profiles[username] = {
+        profile = {
             "favorite_genres": preferences.get("favorite_genres", []),
             "disliked_genres": preferences.get("disliked_genres", []),
             "preferred_rating_range": preferences.get("preferred_rating_range", [6.0, 10.0]),
@@ -71,45 +882,74 @@ class NetflixMovieRecommender:
             "maturity_rating": preferences.get("maturity_rating", "All"),
             "created_date": datetime.now()
         }
-        self.viewing_history[username] = []
-        self.ratings[username] = {}
-        self.watchlist[username] = []
-        print(f"Profile created for {username}")
+        with self._user_locks.lock_for(username):
+            self.user_profiles[username] = profile
+            self.storage.save_profile(username, profile)
+            # Re-creating a profile starts the user over, in storage as in memory
+            self.storage.reset_user(username)
+            self.viewing_history[username] = ViewingHistory()
+            self.ratings[username] = {}
+            self.user_stats[username] = UserStats()
+            self.preferences[username] = PreferenceVector(profile["favorite_genres"], profile["disliked_genres"])
+            self.watchlist[username] = []
+            self._user_events[username] = self._user_events.get(username, 0) + 1
+            self.recommendation_cache.invalidate_user(username)
+        return self._status("created", f"Profile created for {username}")
     
-    def add_to_watchlist(self, username: str, movie_id: int) -> None:
+    def update_user_profile(self, username: str, preferences: Dict) -> str:
+        """Change preferences of an existing profile"""
+        if username not in self.user_profiles:
+            return self._status("user_not_found", "User profile not found")
+        
+        with self._user_locks.lock_for(username):
+            profile = dict(self.user_profiles[username])
+            profile.update((key, value) for key, value in preferences.items()
+                           if key in profile and key != "created_date")
+            self.user_profiles[username] = profile
+            self.storage.save_profile(username, profile)
+            self.preferences[username].set_prior(profile["favorite_genres"], profile.get("disliked_genres", []))
+            self.recommendation_cache.invalidate_user(username)
+        return self._status("updated", f"Profile updated for {username}")
+    
+    def add_to_watchlist(self, username: str, movie_id: int) -> str:
         """Add a movie to user's watchlist"""
         if username not in self.user_profiles:
-            print("User profile not found")
-            return
+            return self._status("user_not_found", "User profile not found")
         
-        if movie_id not in [movie["id"] for movie in self.movies]:
-            print("Movie not found")
-            return
+        if movie_id not in self.movies:
+            return self._status("movie_not_found", "Movie not found")
         
-        if movie_id not in self.watchlist[username]:
-            self.watchlist[username].append(movie_id)
-            movie_title = next(m["title"] for m in self.movies if m["id"] == movie_id)
-            print(f"Added '{movie_title}' to watchlist")
+        with self._user_update(username) as writes:
+            added = movie_id not in self.watchlist[username]
+            if added:
+                self.watchlist[username].append(movie_id)
+                writes.append(lambda: self.storage.add_to_watchlist(username, movie_id))
+        if added:
+            movie_title = self.movies.get(movie_id)["title"]
+            return self._status("added", f"Added '{movie_title}' to watchlist")
         else:
-            print("Movie already in watchlist")
+            return self._status("already_in_watchlist", "Movie already in watchlist")
     
-    def remove_from_watchlist(self, username: str, movie_id: int) -> None:
+    def remove_from_watchlist(self, username: str, movie_id: int) -> str:
         """Remove a movie from user's watchlist"""
-        if username in self.watchlist and movie_id in self.watchlist[username]:
-            self.watchlist[username].remove(movie_id)
-            movie_title = next(m["title"] for m in self.movies if m["id"] == movie_id)
-            print(f"Removed '{movie_title}' from watchlist")
+        with self._user_update(username) as writes:
+            removed = username in self.watchlist and movie_id in self.watchlist[username]
+            if removed:
+                self.watchlist[username].remove(movie_id)
+                writes.append(lambda: self.storage.remove_from_watchlist(username, movie_id))
+        if removed:
+            movie_title = self.movies.get(movie_id)["title"]
+            return self._status("removed", f"Removed '{movie_title}' from watchlist")
+        return "not_in_watchlist"
     
-    def watch_movie(self, username: str, movie_id: int) -> None:
+    def watch_movie(self, username: str, movie_id: int) -> str:
         """Record that a user watched a movie"""
         if username not in self.user_profiles:
-            print("User profile not found")
-            return
+            return self._status("user_not_found", "User profile not found")
         
-        movie = next((m for m in self.movies if m["id"] == movie_id), None)
+        movie = self.movies.get(movie_id)
         if not movie:
-            print("Movie not found")
-            return
+            return self._status("movie_not_found", "Movie not found")
         
         watch_record = {
             "movie_id": movie_id,
@@ -117,112 +957,422 @@ class NetflixMovieRecommender:
             "completion_percentage": random.randint(70, 100)  # Simulate completion
         }
         
-        self.viewing_history[username].append(watch_record)
-        
-        # Remove from watchlist if present
-        if movie_id in self.watchlist.get(username, []):
-            self.watchlist[username].remove(movie_id)
+        with self._user_update(username) as writes:
+            self._record_watches(username, [watch_record])
+            writes.append(lambda: self.storage.append_watch(username, watch_record))
+            
+            # Remove from watchlist if present
+            if movie_id in self.watchlist.get(username, []):
+                self.watchlist[username].remove(movie_id)
+                writes.append(lambda: self.storage.remove_from_watchlist(username, movie_id))
         
-        print(f"Recorded viewing of '{movie['title']}'")
+        return self._status("recorded", f"Recorded viewing of '{movie['title']}'")
+    
+    def _record_watches(self, username: str, watch_records: List[Dict]) -> None:
+        """Apply validated watch events to in-memory state; caller holds the user's lock"""
+        # Load the aggregates before the history grows, or a first load would count these events twice
+        stats = self.user_stats[username]
+        preferences = self.preferences[username]
+        self.viewing_history[username].extend(watch_records)
+        for watch_record in watch_records:
+            movie = self.movies.get(watch_record["movie_id"])
+            self.trending.record(movie, watch_record["watched_date"])
+            stats.add_watch(movie, watch_record["watched_date"])
+            preferences.observe(movie, watch_value(watch_record["completion_percentage"]), watch_record["watched_date"],
+                                publish=False)
+        preferences.publish()
+        self.recommendation_cache.invalidate_user(username)
+        self._user_events[username] = self._user_events.get(username, 0) + 1
     
-    def rate_movie(self, username: str, movie_id: int, rating: float) -> None:
+    def _record_ratings(self, username: str, ratings: Dict[int, float]) -> None:
+        """Apply validated ratings to in-memory state; caller holds the user's lock"""
+        stats = self.user_stats[username]
+        preferences = self.preferences[username]
+        previous = self.ratings[username]
+        now = datetime.now()
+        for movie_id, rating in ratings.items():
+            stats.add_rating(rating, previous.get(movie_id))
+            preferences.rate(self.movies.get(movie_id), rating_value(rating), now, publish=False)
+        preferences.publish()
+        self.ratings[username] = {**previous, **ratings}
+        self.recommendation_cache.invalidate_user(username)
+        self._user_events[username] = self._user_events.get(username, 0) + 1
+    
+    def rate_movie(self, username: str, movie_id: int, rating: float) -> str:
         """Allow user to rate a movie (1-10 scale)"""
         if username not in self.user_profiles:
-            print("User profile not found")
-            return
+            return self._status("user_not_found", "User profile not found")
         
         if not 1 <= rating <= 10:
-            print("Rating must be between 1 and 10")
-            return
+            return self._status("invalid_rating", "Rating must be between 1 and 10")
+        
+        movie = self.movies.get(movie_id)
+        if not movie:
+            return self._status("movie_not_found", "Movie not found")
         
-        self.ratings[username][movie_id] = rating
-        movie_title = next(m["title"] for m in self.movies if m["id"] == movie_id)
-        print(f"Rated '{movie_title}': {rating}/10")
+        with self._user_update(username) as writes:
+            self._record_ratings(username, {movie_id: rating})
+            writes.append(lambda: self.storage.save_rating(username, movie_id, rating))
+        movie_title = movie["title"]
+        return self._status("rated", f"Rated '{movie_title}': {rating}/10")
     
-    def _generate_trending_and_new(self) -> None:
-        """Generate trending movies and new releases"""
-        # Simulate trending based on recent Netflix originals and high ratings
-        netflix_originals = [m for m in self.movies if m["category"] == "Netflix Original"]
-        self.trending_movies = sorted(netflix_originals, key=lambda x: x["rating"], reverse=True)[:8]
+    def ingest_file(self, path: str, chunk_size: int = 10000) -> Dict:
+        """Bulk ingest watch/rate events from a .jsonl or .csv file"""
+        return self.ingest_events(read_events(path), chunk_size)
+    
+    def ingest_events(self, events, chunk_size: int = 10000) -> Dict:
+        """Bulk ingest an iterable of watch/rate events in bounded-memory chunks.
+        
+        Events look like {"type": "watch", "username": ..., "movie_id": ...,
+        "watched_date": ..., "completion_percentage": ...} or {"type": "rate",
+        "username": ..., "movie_id": ..., "rating": ...}. Returns counts and
+        throughput instead of printing per event.
+        """
+        report = {"events": 0, "watches": 0, "ratings": 0, "rejected": 0, "rejects": {}}
+        started = time.perf_counter()
+        for chunk in chunked(events, chunk_size):
+            self._ingest_chunk(chunk, report)
+        report["seconds"] = time.perf_counter() - started
+        report["events_per_second"] = report["events"] / report["seconds"] if report["seconds"] else 0.0
+        return report
+    
+    def _ingest_chunk(self, chunk: List[Dict], report: Dict) -> None:
+        watches: Dict[str, List[Dict]] = {}
+        ratings: Dict[str, Dict[int, float]] = {}
+        rejects = report["rejects"]
+        latest = time.time() + CLOCK_SKEW_SECONDS
+        
+        for raw_event in chunk:
+            report["events"] += 1
+            event = parse_event(raw_event)
+            if event is None:
+                reason = "malformed"
+            elif event["username"] not in self.user_profiles:
+                reason = "unknown_user"
+            elif event["movie_id"] not in self.movies:
+                reason = "unknown_movie"
+            elif event["type"] == "rate" and not 1 <= event["rating"] <= 10:
+                reason = "invalid_rating"
+            elif event["type"] == "watch" and not 0 <= event["completion_percentage"] <= 100:
+                reason = "invalid_completion"
+            elif event["type"] == "watch" and event["watched_date"].timestamp() > latest:
+                reason = "invalid_date"
+            else:
+                reason = None
+            if reason:
+                report["rejected"] += 1
+                rejects[reason] = rejects.get(reason, 0) + 1
+                continue
+            
+            username, movie_id = event["username"], event["movie_id"]
+            if event["type"] == "watch":
+                watches.setdefault(username, []).append({
+                    "movie_id": movie_id,
+                    "watched_date": event["watched_date"],
+                    "completion_percentage": event["completion_percentage"],
+                })
+                report["watches"] += 1
+            else:
+                ratings.setdefault(username, {})[movie_id] = event["rating"]
+                report["ratings"] += 1
         
-        # New releases (movies from 2022-2023)
-        self.new_releases = [m for m in self.movies if m["year"] >= 2022]
+        # Apply the chunk one user at a time, dropping watched titles from each watchlist in one pass
+        watch_rows, removed_rows = [], []
+        for username in watches.keys() | ratings.keys():
+            with self._user_locks.lock_for(username):
+                if username in ratings:
+                    self._record_ratings(username, ratings[username])
+                if username in watches:
+                    self._record_watches(username, watches[username])
+                    watch_rows.extend((username, record) for record in watches[username])
+                    movie_ids = {record["movie_id"] for record in watches[username]}
+                    watchlist = self.watchlist[username]
+                    if any(movie_id in movie_ids for movie_id in watchlist):
+                        removed_rows.extend((username, m) for m in watchlist if m in movie_ids)
+                        watchlist[:] = [m for m in watchlist if m not in movie_ids]
+        
+        self.storage.append_watches(watch_rows)
+        self.storage.save_ratings([(u, m, r) for u, user_ratings in ratings.items() for m, r in user_ratings.items()])
+        self.storage.remove_from_watchlists(removed_rows)
     
-    def get_trending_movies(self) -> List[Dict]:
-        """Get currently trending movies"""
-        return self.trending_movies
+    def get_trending_movies(self, limit: int = 8, genre: Optional[str] = None,
+                            category: Optional[str] = None) -> List[Dict]:
+        """Get currently trending movies, optionally within one genre or category"""
+        trending = [self.movies.get(movie_id) for movie_id in self.trending.top(limit, genre, category)
+                    if movie_id in self.movies]
+        
+        # Until there are enough recent viewings, fill the row with its highest rated titles
+        if len(trending) < limit:
+            top_rated = self.movies.top_rated(limit, genre, category or "Netflix Original")
+            seen = {movie["id"] for movie in trending}
+            fill = [m for m in top_rated if m["id"] not in seen]
+            trending += fill[:limit - len(trending)]
+        return trending
     
     def get_new_releases(self) -> List[Dict]:
-        """Get new releases"""
-        return self.new_releases
+        """Get movies released within the last new_release_years calendar years"""
+        return self.movies.released_since(datetime.now().year - self.new_release_years + 1)
     
-    def search_movies(self, query: str, filters: Optional[Dict] = None) -> List[Dict]:
+    def search_movies(self, query: str, filters: Optional[Dict] = None, limit: int = 20) -> List[Dict]:
         """Search for movies with optional filters"""
-        results = []
-        query_lower = query.lower()
-        
-        for movie in self.movies:
-            # Search in title, genre, and tags
-            if (query_lower in movie["title"].lower() or 
-                any(query_lower in genre.lower() for genre in movie["genre"]) or
-                any(query_lower in tag.lower() for tag in movie.get("tags", []))):
-                results.append(movie)
-        
-        # Apply filters if provided
-        if filters:
-            if "genre" in filters:
-                results = [m for m in results if any(g in m["genre"] for g in filters["genre"])]
-            if "year_range" in filters:
-                min_year, max_year = filters["year_range"]
-                results = [m for m in results if min_year <= m["year"] <= max_year]
-            if "rating_min" in filters:
-                results = [m for m in results if m["rating"] >= filters["rating_min"]]
-            if "category" in filters:
-                results = [m for m in results if m["category"] == filters["category"]]
-        
-        return results[:20]  # Limit results
+        return self.search_index.search(query, filters, limit)
     
     def get_recommendations(self, username: str, recommendation_type: str = "for_you") -> List[Dict]:
         """Get personalized recommendations"""
         if username not in self.user_profiles:
-            print("User profile not found")
+            self._status("user_not_found", "User profile not found")
             return []
         
-        user_profile = self.user_profiles[username]
-        user_history = self.viewing_history.get(username, [])
-        user_ratings = self.ratings.get(username, {})
+        if recommendation_type not in RECOMMENDATION_TYPES:
+            recommendation_type = "for_you"
         
+        # Catalog-wide rows are shared by every user
+        if recommendation_type == "trending_now":
+            # The trending engine keeps its own ranking current with every viewing
+            return self.get_trending_movies()
+        owner = None if recommendation_type == "new_releases" else username
+        cached = self.recommendation_cache.get((owner, recommendation_type))
+        if self.metrics is not None:
+            self.metrics.count("cache_hits", recommendation_type, cached is not None)
+        if cached is not None:
+            return list(cached)
+        
+        token = self.recommendation_cache.token(owner)
+        recommendations = self._compute_recommendations(username, recommendation_type)
+        self.recommendation_cache.put((owner, recommendation_type), recommendations, owner, token)
+        if self.metrics is not None:
+            self.metrics.count("results", recommendation_type, len(recommendations))
+        return list(recommendations)
+    
+    def _compute_recommendations(self, username: str, recommendation_type: str) -> List[Dict]:
+        if self.process_pool is not None and recommendation_type in BATCH_SCORERS:
+            return self.get_recommendations_batch([username], recommendation_type)[username]
         if recommendation_type == "for_you":
-            return self._get_personalized_recommendations(username)
+            return self._get_personalized_recommendations(username, self._retrieve_candidates(username, "for_you"))
         elif recommendation_type == "because_you_watched":
             return self._get_because_you_watched_recommendations(username)
         elif recommendation_type == "top_picks":
-            return self._get_top_picks(username)
+            return self._get_top_picks(username, self._retrieve_candidates(username, "top_picks"))
         elif recommendation_type == "trending_now":
             return self.get_trending_movies()
         elif recommendation_type == "new_releases":
             return self.get_new_releases()
         else:
-            return self._get_personalized_recommendations(username)
+            return self._get_collaborative_recommendations(username)
     
-    def _get_personalized_recommendations(self, username: str) -> List[Dict]:
-        """Generate personalized recommendations based on user profile and history"""
+    def get_recommendations_batch(self, usernames: List[str], recommendation_type: str = "for_you",
+                                  chunk_size: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Get recommendations for many users at once, scoring each chunk of users as one matrix product"""
+        known = [u for u in dict.fromkeys(usernames) if u in self.user_profiles]
+        results = {username: [] for username in usernames}
+        
+        if recommendation_type == "trending_now":
+            results.update((u, self.get_trending_movies()) for u in known)
+            return results
+        if recommendation_type == "new_releases":
+            results.update((u, self.get_new_releases()) for u in known)
+            return results
+        if recommendation_type == "collaborative":
+            results.update((u, self._get_collaborative_recommendations(u)) for u in known)
+            return results
+        if recommendation_type not in BATCH_SCORERS:
+            recommendation_type = "for_you"
+        if not self.vectorized and self.process_pool is None:
+            results.update((u, self.get_recommendations(u, recommendation_type)) for u in known)
+            return results
+        
+        if recommendation_type == "because_you_watched":
+            # Users without history fall back to "for you", as in the single-user path
+            no_history = [u for u in known if not self.viewing_history.get(u)]
+            known = [u for u in known if self.viewing_history.get(u)]
+            results.update(self.get_recommendations_batch(no_history, "for_you", chunk_size))
+        
+        inputs = self._scoring_inputs(known, recommendation_type)
+        watched = [self._watched_ids(u) for u in known]
+        if self.process_pool is not None:
+            results.update(self.process_pool.recommend(recommendation_type, known, inputs, watched))
+            return results
+        
+        columns = self.movies.columns()
+        if chunk_size is None:
+            chunk_size = max(1, BATCH_SCORE_BUDGET // max(len(columns), 1))
+        score_chunk = BATCH_SCORERS[recommendation_type]
+        
+        for start in range(0, len(known), chunk_size):
+            end = start + chunk_size
+            scores, eligible, limit = score_chunk(inputs[start:end], columns)
+            watched_rows = [columns.rows_of(ids) for ids in watched[start:end]]
+            for username, rows in zip(known[start:end], columns.rank_batch(scores, eligible, limit, watched_rows)):
+                results[username] = [columns.movies[row] for row in rows]
+        return results
+    
+    def _scoring_inputs(self, usernames: List[str], recommendation_type: str) -> List[Dict]:
+        """Per-user input to the batch scorer: profile and preference weights, or the most recently watched movie"""
+        if recommendation_type == "because_you_watched":
+            return [self.movies.get(self.viewing_history[u].movie_ids[-1]) for u in usernames]
+        return [{"profile": self.user_profiles[u], "weights": self._preference_weights(u)} for u in usernames]
+    
+    def start_process_pool(self, workers: Optional[int] = None) -> None:
+        """Score "for you", "because you watched" and "top picks" in worker processes.
+        
+        The catalog's columnar snapshot is published once to shared memory and
+        attached by every worker without copying; users are sharded across
+        workers by a stable hash of their username.
+        """
+        if np is None:
+            self._status("numpy_unavailable", "Process pool scoring requires NumPy")
+            return
+        from netflix_parallel import ProcessPoolScorer
+        
+        self.stop_process_pool()
+        self.process_pool = ProcessPoolScorer(self.movies, workers)
+    
+    def stop_process_pool(self) -> None:
+        if self.process_pool is not None:
+            self.process_pool.close()
+            self.process_pool = None
+    
+    def build_ann_index(self, n_lists: Optional[int] = None, target_recall: float = 0.95,
+                        sample_queries: int = 64) -> Dict[str, float]:
+        """Build the approximate nearest-neighbour indexes used to retrieve candidates for reranking.
+        
+        "Top picks" only ranks titles rated 8.0 or higher, so its index holds
+        just those. Each index probes the fewest lists whose recall of the
+        exact top ann_candidates, on queries of a sample of users, reaches
+        target_recall. Returns that recall per recommendation type.
+        """
+        if IVFIndex is None:
+            self._status("numpy_required", "The ANN index requires NumPy")
+            return {}
+        
+        columns = self.movies.columns()
+        dimensions, vectors = columns.content_vectors()
+        rng = random.Random(0)
+        indexes = {}
+        for recommendation_type, rows in (("for_you", np.arange(len(columns))),
+                                          ("top_picks", np.flatnonzero(columns.rating >= 8.0))):
+            if not len(rows):
+                continue
+            index = IVFIndex(dimensions, n_lists).build(columns.ids[rows], vectors[rows])
+            queries = np.array([index.query_vector(weights)
+                                for weights in self._ann_sample_queries(recommendation_type, sample_queries, rng)])
+            index.tune(queries, self.ann_candidates, target_recall)
+            index.catalog_version = self.movies.version
+            index.catalog_fingerprint = self.movies.fingerprint()
+            indexes[recommendation_type] = index
+        self.ann_indexes = indexes
+        self.recommendation_cache.clear()
+        return {recommendation_type: index.recall for recommendation_type, index in indexes.items()}
+    
+    def build_similarity_index(self, path: Optional[str] = None) -> None:
+        """Build the neighbour lists behind "because you watched", or load them from path.
+        
+        Until this runs those recommendations scan the whole catalog. With a
+        path, the index saved there is loaded if it was built for the current
+        catalog; otherwise it is rebuilt and saved there for the next start.
+        """
+        if path is None or not (os.path.exists(path) and self.similar_movies.load(path)):
+            self.similar_movies.build()
+            if path is not None:
+                self.similar_movies.save(path)
+        self.recommendation_cache.clear()
+    
+    def save_ann_index(self, directory: str) -> None:
+        """Write the ANN indexes to directory, one subdirectory per recommendation type"""
+        for recommendation_type, index in self.ann_indexes.items():
+            index.save(os.path.join(directory, recommendation_type))
+    
+    def load_ann_index(self, directory: str, mmap: bool = True) -> str:
+        """Load ANN indexes written by save_ann_index() for the same catalog.
+        
+        With mmap the index arrays are paged in from the files on demand, so
+        recommenders in several processes loading the same directory share
+        one copy through the page cache. Indexes saved for a catalog that has
+        changed since are skipped; those recommendations score the whole
+        catalog until build_ann_index() runs again.
+        """
+        if IVFIndex is None:
+            return self._status("numpy_required", "The ANN index requires NumPy")
+        
+        fingerprint = self.movies.fingerprint()
+        indexes, stale = {}, []
+        for recommendation_type in sorted(os.listdir(directory)):
+            index = IVFIndex.load(os.path.join(directory, recommendation_type), mmap)
+            if index.catalog_fingerprint != fingerprint:
+                stale.append(recommendation_type)
+                continue
+            # Built for this exact catalog, so it is current until the next edit
+            index.catalog_version = self.movies.version
+            indexes[recommendation_type] = index
+        self.ann_indexes = indexes
+        self.recommendation_cache.clear()
+        if stale:
+            return self._status("stale_ann_index", f"Skipped ANN indexes built for another catalog: {', '.join(stale)}")
+        return self._status("loaded", f"Loaded ANN indexes: {', '.join(indexes)}")
+    
+    def _ann_sample_queries(self, recommendation_type: str, count: int, rng: random.Random) -> List[Dict[str, float]]:
+        """Retrieval queries of up to count users in memory, topped up with ones for made-up profiles"""
+        usernames = list(self.preferences)
+        queries = [self._ann_query(u, recommendation_type) for u in rng.sample(usernames, min(count, len(usernames)))]
+        genres = self.movies.columns().genres
+        while len(queries) < count:
+            liked = rng.sample(genres, min(len(genres), rng.randint(1, 3)))
+            disliked = rng.sample([g for g in genres if g not in liked], min(len(genres) - len(liked), rng.randint(0, 2)))
+            queries.append(self._ann_weights(PreferenceVector(liked, disliked).weights(), recommendation_type))
+        return queries
+    
+    def _ann_query(self, username: str, recommendation_type: str) -> Dict[str, float]:
+        """Linear part of a recommender's score, as weights over the index dimensions"""
+        return self._ann_weights(self._preference_weights(username), recommendation_type)
+    
+    @staticmethod
+    def _ann_weights(weights: Dict[str, float], recommendation_type: str) -> Dict[str, float]:
+        if recommendation_type == "top_picks":
+            weights = {name: weight / 3 for name, weight in weights.items()}
+            weights["rating"] = 10
+            return weights
+        
+        weights["category:Netflix Original"] = weights.get("category:Netflix Original", 0.0) + 0.5
+        weights["recent"] = 1.0
+        # Stands in for the preferred-rating-range bonus, which is not linear: among
+        # otherwise equal titles, higher rated ones are the likelier to be in range
+        weights["rating"] = 2.0
+        return weights
+    
+    def _retrieve_candidates(self, username: str, recommendation_type: str) -> Optional[List[Dict]]:
+        """Candidate movies from the ANN index, or None to score the whole catalog"""
+        index = self.ann_indexes.get(recommendation_type)
+        if index is None or index.catalog_version != self.movies.version:
+            if self.metrics is not None:
+                self.metrics.count("candidates", recommendation_type, len(self.movies))
+            return None
+        
+        query = index.query_vector(self._ann_query(username, recommendation_type))
+        candidates = [self.movies.get(int(movie_id)) for movie_id in index.search(query, self.ann_candidates)]
+        candidates.sort(key=lambda movie: self.movies.position(movie["id"]))
+        if self.metrics is not None:
+            self.metrics.count("candidates", recommendation_type, len(candidates))
+        return candidates
+    
+    def _get_personalized_recommendations(self, username: str, candidates: Optional[List[Dict]] = None) -> List[Dict]:
+        """Generate personalized recommendations based on user profile and history.
+        
+        candidates restricts scoring to a retrieved subset of the catalog.
+        """
+        if self.vectorized and candidates is None:
+            return self._get_personalized_recommendations_vectorized(username)
+        
         user_profile = self.user_profiles[username]
-        watched_movie_ids = [record["movie_id"] for record in self.viewing_history.get(username, [])]
+        watched_movie_ids = self._watched_ids(username)
+        preference = self.preferences[username].dense()
         
-        candidates = []
-        for movie in self.movies:
+        scored = []
+        for movie in self.movies if candidates is None else candidates:
             if movie["id"] in watched_movie_ids:
                 continue
             
-            score = 0
-            
-            # Genre preference scoring
-            for genre in movie["genre"]:
-                if genre in user_profile["favorite_genres"]:
-                    score += 3
-                elif genre in user_profile.get("disliked_genres", []):
-                    score -= 2
+            # Learned preference for the movie's genres, category and tags
+            score = sum(preference[code] for code in movie.features)
             
             # Rating preference
             rating_min, rating_max = user_profile["preferred_rating_range"]
@@ -242,11 +1392,25 @@ class NetflixMovieRecommender:
             if movie["year"] >= 2020:
                 score += 1
             
-            candidates.append((movie, score))
+            scored.append((movie, score))
         
         # Sort by score and return top recommendations
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return [movie for movie, score in candidates[:10]]
+        started = time.perf_counter()
+        scored.sort(key=lambda x: x[1], reverse=True)
+        if self.metrics is not None:
+            self.metrics.phase("rank", "for_you", time.perf_counter() - started)
+        return [movie for movie, score in scored[:10]]
+    
+    def _get_personalized_recommendations_vectorized(self, username: str) -> List[Dict]:
+        """Same scoring as _get_personalized_recommendations, computed over the columnar catalog"""
+        columns = self.movies.columns()
+        user = {"profile": self.user_profiles[username], "weights": self._preference_weights(username)}
+        scores, _, limit = score_for_you([user], columns)
+        started = time.perf_counter()
+        recommendations = columns.top_k(scores[:, 0], limit, columns.unwatched_mask(self._watched_ids(username)))
+        if self.metrics is not None:
+            self.metrics.phase("rank", "for_you", time.perf_counter() - started)
+        return recommendations
     
     def _get_because_you_watched_recommendations(self, username: str) -> List[Dict]:
         """Generate recommendations based on recently watched movies"""
@@ -256,99 +1420,138 @@ class NetflixMovieRecommender:
         
         # Get the most recently watched movie
         recent_watch = user_history[-1]
-        recent_movie = next(m for m in self.movies if m["id"] == recent_watch["movie_id"])
+        recent_movie = self.movies.get(recent_watch["movie_id"])
+        watched_ids = user_history.watched_ids()
         
-        recommendations = []
-        watched_ids = [record["movie_id"] for record in user_history]
+        # Precomputed neighbours answer the request unless watched titles used up the list
+        neighbours = [movie for movie, score in self.similar_movies.neighbours(recent_movie["id"])
+                      if movie["id"] not in watched_ids]
+        if len(neighbours) >= 8 or self.similar_movies.is_complete(recent_movie["id"]):
+            if self.metrics is not None:
+                self.metrics.count("candidates", "because_you_watched", len(neighbours))
+            return neighbours[:8]
         
+        if self.metrics is not None:
+            self.metrics.count("candidates", "because_you_watched", len(self.movies))
+        recommendations = []
         for movie in self.movies:
             if movie["id"] in watched_ids:
                 continue
             
-            similarity_score = 0
-            
-            # Same genre
-            common_genres = set(movie["genre"]) & set(recent_movie["genre"])
-            similarity_score += len(common_genres) * 2
-            
-            # Similar tags
-            common_tags = set(movie.get("tags", [])) & set(recent_movie.get("tags", []))
-            similarity_score += len(common_tags)
-            
-            # Similar category
-            if movie["category"] == recent_movie["category"]:
-                similarity_score += 1
-            
-            # Similar year (within 5 years)
-            if abs(movie["year"] - recent_movie["year"]) <= 5:
-                similarity_score += 0.5
-            
+            similarity_score = movie_similarity(movie, recent_movie)
             if similarity_score > 0:
                 recommendations.append((movie, similarity_score))
         
         recommendations.sort(key=lambda x: x[1], reverse=True)
         return [movie for movie, score in recommendations[:8]]
     
-    def _get_top_picks(self, username: str) -> List[Dict]:
-        """Get top picks for user based on high ratings and user preferences"""
-        user_profile = self.user_profiles[username]
-        watched_ids = [record["movie_id"] for record in self.viewing_history.get(username, [])]
+    def train_collaborative_model(self, factors: int = 32, iterations: int = 10,
+                                  regularization: float = 0.1) -> None:
+        """Train the collaborative filtering model on every stored user's ratings and viewing history"""
+        if CollaborativeFilteringModel is None:
+            self._status("numpy_required", "Collaborative filtering requires NumPy")
+            return
         
-        candidates = []
-        for movie in self.movies:
+        usernames = sorted(set(self.user_profiles) | set(self.storage.usernames()))
+        versions, preferences = {}, {}
+        for username in usernames:
+            # Counted before the data is read, so an event the data may have missed leaves the user behind
+            versions[username] = self._user_events.get(username, 0)
+            preferences[username] = self._user_preferences(username, load=False)
+        model = CollaborativeFilteringModel(factors, regularization, iterations).fit(preferences, versions)
+        self.collaborative_model = model
+        self.recommendation_cache.clear()
+    
+    def _user_preferences(self, username: str, load: bool = True) -> Dict[int, float]:
+        """Preference per watched or rated movie: the rating if given, else completion on a 1-10 scale.
+        
+        Without load, a user who is not in memory is read from storage without
+        being kept, so a training pass over every stored user does not leave
+        them all resident.
+        """
+        if load:
+            history = self.viewing_history.get(username) or ViewingHistory()
+            ratings = self.ratings.get(username, {})
+        else:
+            history = self.viewing_history.peek(username)
+            if history is None:
+                history = ViewingHistory(self.storage.load_history(username))
+            ratings = self.ratings.peek(username)
+            if ratings is None:
+                ratings = self.storage.load_ratings(username)
+        preferences = {movie_id: max(1.0, completion / 10)
+                       for movie_id, completion in zip(history.movie_ids, history.completions)}
+        preferences.update(ratings)
+        return preferences
+    
+    def _get_collaborative_recommendations(self, username: str) -> List[Dict]:
+        """Recommendations from the collaborative filtering model, or "for you" without one"""
+        model = self.collaborative_model
+        with self._user_locks.lock_for(username):
+            preferences = self._user_preferences(username)
+            # Folded in again whenever the model misses some of the user's events, including
+            # ones that arrived while it was trained; under the lock events are counted under,
+            # so the factors and the version recorded with them always agree
+            version = self._user_events.get(username, 0)
+            if model is not None and preferences and model.user_versions.get(username) != version:
+                model.fold_in(username, preferences, version)
+        if model is None or not preferences:
+            return self._get_personalized_recommendations(username)
+        
+        movie_ids = model.recommend(username, set(preferences), 10)
+        return [self.movies.get(movie_id) for movie_id in movie_ids if movie_id in self.movies]
+    
+    def _get_top_picks(self, username: str, candidates: Optional[List[Dict]] = None) -> List[Dict]:
+        """Get top picks for user based on high ratings and user preferences.
+        
+        candidates restricts scoring to a retrieved subset of the catalog.
+        """
+        watched_ids = self._watched_ids(username)
+        preference = self.preferences[username].dense()
+        
+        scored = []
+        for movie in self.movies if candidates is None else candidates:
             if movie["id"] in watched_ids:
                 continue
             
             # High rating movies (8.0+)
             if movie["rating"] >= 8.0:
-                score = movie["rating"]
-                
-                # Boost if matches user's favorite genres
-                for genre in movie["genre"]:
-                    if genre in user_profile["favorite_genres"]:
-                        score += 1
+                # Boost by the learned preference, a favorite genre adding one point
+                score = movie["rating"] + sum(preference[code] for code in movie.features) / 3
                 
-                candidates.append((movie, score))
+                scored.append((movie, score))
         
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return [movie for movie, score in candidates[:8]]
+        started = time.perf_counter()
+        scored.sort(key=lambda x: x[1], reverse=True)
+        if self.metrics is not None:
+            self.metrics.phase("rank", "top_picks", time.perf_counter() - started)
+        return [movie for movie, score in scored[:8]]
     
     def get_user_stats(self, username: str) -> Dict:
         """Get user viewing statistics"""
         if username not in self.user_profiles:
             return {}
         
-        history = self.viewing_history.get(username, [])
-        ratings_data = self.ratings.get(username, {})
-        
-        if not history:
-            return {"message": "No viewing history found"}
-        
-        # Calculate stats
-        total_movies = len(history)
-        total_minutes = sum(next(m["duration"] for m in self.movies if m["id"] == record["movie_id"]) 
-                          for record in history)
-        
-        # Favorite genres
-        genre_count = {}
-        for record in history:
-            movie = next(m for m in self.movies if m["id"] == record["movie_id"])
-            for genre in movie["genre"]:
-                genre_count[genre] = genre_count.get(genre, 0) + 1
-        
-        favorite_genres = sorted(genre_count.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # Average rating given
-        avg_rating = sum(ratings_data.values()) / len(ratings_data) if ratings_data else 0
-        
-        return {
-            "total_movies_watched": total_movies,
-            "total_hours_watched": round(total_minutes / 60, 1),
-            "favorite_genres": [genre for genre, count in favorite_genres],
-            "average_rating_given": round(avg_rating, 1),
-            "watchlist_count": len(self.watchlist.get(username, [])),
-            "movies_rated": len(ratings_data)
-        }
+        with self._user_locks.lock_for(username):
+            stats = self.user_stats[username]
+            if not stats.movies_watched:
+                return {"message": "No viewing history found"}
+            
+            return {
+                "total_movies_watched": stats.movies_watched,
+                "total_hours_watched": round(stats.minutes / 60, 1),
+                "favorite_genres": stats.top_genres(3),
+                "average_rating_given": round(stats.average_rating(), 1),
+                "watchlist_count": len(self.watchlist.get(username, [])),
+                "movies_rated": stats.rating_count
+            }
+    
+    def get_watch_time(self, username: str, period: str = "week") -> Dict[str, float]:
+        """Hours watched per "week" or "month", oldest first"""
+        if username not in self.user_profiles:
+            return {}
+        with self._user_locks.lock_for(username):
+            return self.user_stats[username].hours_by(period)
     
     def display_movie_info(self, movie: Dict) -> None:
         """Display formatted movie information"""
@@ -439,9 +1642,12 @@ def main():
         
         elif choice == "4":
             new_releases = recommender.get_new_releases()
-            print("\n🆕 New Releases:")
-            for i, movie in enumerate(new_releases, 1):
-                print(f"{i}. {movie['title']} ({movie['year']}) - {movie['rating']}/10")
+            if new_releases:
+                print("\n🆕 New Releases:")
+                for i, movie in enumerate(new_releases, 1):
+                    print(f"{i}. {movie['title']} ({movie['year']}) - {movie['rating']}/10")
+            else:
+                print("\n🆕 No new releases right now.")
         
         elif choice == "5":
             movie_id = input("Enter movie ID to add to watchlist: ").strip()
@@ -470,12 +1676,13 @@ def main():
             if watchlist_ids:
                 print("\n📋 Your Watchlist:")
                 for movie_id in watchlist_ids:
-                    movie = next(m for m in recommender.movies if m["id"] == movie_id)
+                    movie = recommender.movies.get(movie_id)
                     print(f"• {movie['title']} ({movie['year']})")
             else:
                 print("\n📋 Your watchlist is empty.")
         
         elif choice == "9":
+            recommender.close()
             print("Thanks for using Netflix Movie Recommender! 🎬")
             break
         
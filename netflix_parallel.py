@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from netflix_movie import BATCH_SCORE_BUDGET, BATCH_SCORERS, ColumnarCatalog, MovieCatalog
+
+# Arrays of a ColumnarCatalog that scoring reads; everything else is rebuilt from the vocabularies
+SHARED_ARRAYS = ("ids", "rating", "duration", "year", "category_code", "genre_matrix")
+
+
+class TagRows(Mapping):
+    """Read-only {tag: rows} view over CSR arrays, in place of ColumnarCatalog.tag_rows"""
+
+    def __init__(self, tags: List[str], offsets: np.ndarray, members: np.ndarray):
+        self._index = {tag: i for i, tag in enumerate(tags)}
+        self._offsets = offsets
+        self._members = members
+
+    def __getitem__(self, tag: str) -> np.ndarray:
+        i = self._index[tag]
+        return self._members[self._offsets[i]:self._offsets[i + 1]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class SharedColumns(ColumnarCatalog):
+    """ColumnarCatalog whose arrays live in one shared memory block.
+
+    publish() copies a snapshot into a new block once; attach() maps that block
+    in another process without copying. Attached columns hold no movie dicts
+    and no id-to-row map, so they answer row-level questions only (top_k_rows,
+    rank_batch); the parent turns ids into rows before submitting.
+    """
+
+    @staticmethod
+    def publish(columns: ColumnarCatalog) -> tuple:
+        """Copy columns into a new shared memory block; returns (block, spec to pass to attach)"""
+        tags = list(columns.tag_rows)
+        tag_members = [columns.tag_rows[tag] for tag in tags]
+        arrays = {name: getattr(columns, name) for name in SHARED_ARRAYS}
+        arrays["tag_offsets"] = np.concatenate([[0], np.cumsum([len(rows) for rows in tag_members])]).astype(np.int64)
+        arrays["tag_members"] = np.concatenate(tag_members) if tag_members else np.zeros(0, dtype=np.int64)
+
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            size = -(-size // 64) * 64  # keep every array cache-line aligned
+            layout[name] = (size, array.shape, array.dtype.str)
+            size += array.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            offset, shape, dtype = layout[name]
+            np.ndarray(shape, dtype, buffer=block.buf, offset=offset)[...] = array
+
+        spec = {"name": block.name, "layout": layout, "version": columns.version,
+                "genres": columns.genres, "categories": columns.categories, "tags": tags}
+        return block, spec
+
+    @classmethod
+    def attach(cls, spec: Dict) -> "SharedColumns":
+        block = shared_memory.SharedMemory(name=spec["name"])
+        arrays = {name: np.ndarray(shape, dtype, buffer=block.buf, offset=offset)
+                  for name, (offset, shape, dtype) in spec["layout"].items()}
+        for array in arrays.values():
+            array.flags.writeable = False
+
+        columns = cls.__new__(cls)
+        columns._block = block  # the arrays are only valid while the block stays mapped
+        columns.version = spec["version"]
+        columns.movies = None
+        for name in SHARED_ARRAYS:
+            setattr(columns, name, arrays[name])
+        columns.genres = spec["genres"]
+        columns.genre_index = {genre: col for col, genre in enumerate(columns.genres)}
+        columns.categories = spec["categories"]
+        columns.category_index = {category: code for code, category in enumerate(columns.categories)}
+        columns.tag_rows = TagRows(spec["tags"], arrays["tag_offsets"], arrays["tag_members"])
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# Per-worker state, set once by the pool initializer
+_columns: Optional[SharedColumns] = None
+
+
+def _attach_worker(spec: Dict) -> None:
+    global _columns
+    _columns = SharedColumns.attach(spec)
+
+
+def _score_chunk(recommendation_type: str, inputs: List[Dict], watched_rows: List[np.ndarray]) -> List[np.ndarray]:
+    """Ranked rows per user for one chunk, computed in a worker"""
+    scores, eligible, limit = BATCH_SCORERS[recommendation_type](inputs, _columns)
+    return _columns.rank_batch(scores, eligible, limit, watched_rows)
+
+
+class ProcessPoolScorer:
+    """Batch recommendation scoring in worker processes over a shared-memory catalog.
+
+    Each worker attaches the published snapshot at startup instead of loading
+    the catalog, and only per-user inputs and ranked rows cross process
+    boundaries. Every shard is a single-process executor and a user always
+    lands on the same shard, chosen by a CRC of the username. A catalog change
+    republishes the snapshot and restarts the workers on the next call.
+    """
+
+    def __init__(self, catalog: MovieCatalog, workers: Optional[int] = None, start_method: str = "spawn"):
+        self.catalog = catalog
+        self.workers = workers or os.cpu_count() or 1
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._block = None
+        self._columns = None
+        self._shards: List[ProcessPoolExecutor] = []
+        self._start()
+
+    def shard_of(self, username: str) -> int:
+        return zlib.crc32(username.encode()) % self.workers
+
+    def recommend(self, recommendation_type: str, usernames: List[str], inputs: List[Dict],
+                  watched_ids: List[List[int]]) -> Dict[str, List[Dict]]:
+        """Top movies per user; inputs and watched_ids are aligned with usernames"""
+        by_shard: Dict[int, List[int]] = {}
+        for i, username in enumerate(usernames):
+            by_shard.setdefault(self.shard_of(username), []).append(i)
+
+        # Submitted under the lock, so a restart by another thread cannot shut these
+        # executors down first; a restart waits for submitted chunks to finish
+        pending = []
+        with self._lock:
+            if self._columns.version != self.catalog.version:
+                self._stop()
+                self._start()
+            columns = self._columns
+            chunk_size = max(1, BATCH_SCORE_BUDGET // max(len(columns), 1))
+            for shard, positions in by_shard.items():
+                for start in range(0, len(positions), chunk_size):
+                    chunk = positions[start:start + chunk_size]
+                    future = self._shards[shard].submit(_score_chunk, recommendation_type, [inputs[i] for i in chunk],
+                                                        [columns.rows_of(watched_ids[i]) for i in chunk])
+                    pending.append((chunk, future))
+
+        results = {}
+        for chunk, future in pending:
+            for i, rows in zip(chunk, future.result()):
+                results[usernames[i]] = [columns.movies[row] for row in rows]
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _start(self) -> None:
+        self._columns = self.catalog.columns()
+        self._block, spec = SharedColumns.publish(self._columns)
+        self._shards = [ProcessPoolExecutor(1, mp_context=self._context, initializer=_attach_worker, initargs=(spec,))
+                        for _ in range(self.workers)]
+
+    def _stop(self) -> None:
+        for shard in self._shards:
+            shard.shutdown()
+        self._shards = []
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
@@ -0,0 +1,129 @@
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from netflix_records import FEATURES, MovieRecord
+
+
+class PreferenceVector:
+    """A user's taste as a dense vector over content features (genres, categories and tags).
+
+    The vector is the profile's stated favorites (+3) and dislikes (-2) plus
+    a learned part: the recency-weighted average of the values of observed
+    events over each event's movie features, scaled by LEARNED_SCALE. An
+    event's weight doubles every half_life, tracked like the trending rows
+    by growing new weights instead of decaying old ones, so observe() only
+    touches the features of one movie. A rating replaces the user's earlier
+    rating of the same movie, so only the latest one counts, as it does when
+    the vector is rebuilt from storage. Learned sums are stored sparsely,
+    since a user only ever touches a sliver of the tag vocabulary; dense()
+    expands them for scoring. A movie's score is the sum of the weights of
+    its features.
+
+    Each update publishes a copy of the prior, sums and mass that is never
+    mutated, and weights() and dense() are computed from the latest copy, so
+    they need no lock against a concurrent update; updates
+    themselves must be serialized by the caller. A run of updates can pass
+    publish=False and call publish() once at the end.
+    """
+
+    LEARNED_SCALE = 3.0
+    # Learned weights are rounded to multiples of this, so sums of them are exact
+    # in any order and the scalar, vectorized and batch scorers rank identically
+    QUANTUM = 2.0 ** -20
+
+    def __init__(self, favorite_genres: Iterable[str] = (), disliked_genres: Iterable[str] = (),
+                 half_life_days: float = 30.0):
+        self.half_life = half_life_days * 86400
+        self._prior: Dict[int, float] = {}
+        self._sums: Dict[int, float] = {}
+        self._mass = 0.0
+        self._origin: Optional[float] = None
+        # movie id -> (feature codes, value, weight) of the rating that currently counts
+        self._ratings: Dict[int, Tuple[Tuple[int, ...], float, float]] = {}
+        # (prior, learned sums, mass) as of the last publish()
+        self._published: Tuple[Dict[int, float], Dict[int, float], float] = ({}, {}, 0.0)
+        self.set_prior(favorite_genres, disliked_genres)
+
+    def set_prior(self, favorite_genres: Iterable[str], disliked_genres: Iterable[str]) -> None:
+        """Stated preferences; favorites take precedence over dislikes"""
+        prior = {FEATURES.code(f"genre:{genre}"): -2.0 for genre in disliked_genres}
+        prior.update((FEATURES.code(f"genre:{genre}"), 3.0) for genre in favorite_genres)
+        self._prior = prior
+        self.publish()
+
+    def observe(self, movie: MovieRecord, value: float, when: datetime, publish: bool = True) -> None:
+        """Move the vector towards (value > 0) or away from (value < 0) the movie's features"""
+        self._add(movie.features, value, self._weight(when))
+        if publish:
+            self.publish()
+
+    def rate(self, movie: MovieRecord, value: float, when: datetime, publish: bool = True) -> None:
+        """Observe a rating, taking back the user's earlier rating of the same movie"""
+        previous = self._ratings.pop(movie["id"], None)
+        if previous is not None:
+            features, previous_value, previous_weight = previous
+            self._add(features, previous_value, -previous_weight)
+        weight = self._weight(when)
+        self._add(movie.features, value, weight)
+        self._ratings[movie["id"]] = (movie.features, value, weight)
+        if publish:
+            self.publish()
+
+    def publish(self) -> None:
+        """Make the updates so far visible to weights() and dense()"""
+        self._published = (self._prior, dict(self._sums), self._mass)
+
+    def dense(self) -> List[float]:
+        """Weights indexed by feature code, covering every feature known so far"""
+        weights = [0.0] * len(FEATURES)
+        for code, weight in self._weights().items():
+            weights[code] = weight
+        return weights
+
+    def weights(self) -> Dict[str, float]:
+        """Non-zero weights by feature name, e.g. {"genre:Drama": 3.0, "tag:heist": 0.4}"""
+        return {FEATURES.values[code]: weight for code, weight in self._weights().items() if weight}
+
+    def _weights(self) -> Dict[int, float]:
+        prior, sums, mass = self._published
+        scale = self.LEARNED_SCALE / mass / self.QUANTUM if mass else 0.0
+        weights = {code: round(total * scale) * self.QUANTUM for code, total in sums.items()}
+        for code, weight in prior.items():
+            weights[code] = weights.get(code, 0.0) + weight
+        return weights
+
+    def _weight(self, when: datetime) -> float:
+        # Clamped to now, or a future-dated event would outweigh every real one
+        timestamp = min(when.timestamp(), time.time())
+        if self._origin is None:
+            self._origin = timestamp
+        exponent = (timestamp - self._origin) / self.half_life
+        if exponent > 64:
+            self._rebase(timestamp)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _add(self, features: Tuple[int, ...], value: float, weight: float) -> None:
+        # weight is negative when a replaced rating is taken back
+        for code in features:
+            self._sums[code] = self._sums.get(code, 0.0) + value * weight
+        self._mass += weight
+
+    def _rebase(self, timestamp: float) -> None:
+        factor = 2.0 ** (-(timestamp - self._origin) / self.half_life)
+        self._origin = timestamp
+        self._sums = {code: total * factor for code, total in self._sums.items()}
+        self._mass *= factor
+        self._ratings = {movie_id: (features, value, weight * factor)
+                         for movie_id, (features, value, weight) in self._ratings.items()}
+
+
+def watch_value(completion_percentage: float) -> float:
+    """Preference signal of a viewing: finishing a movie counts fully, abandoning it barely"""
+    return completion_percentage / 100
+
+
+def rating_value(rating: float) -> float:
+    """Preference signal of a 1-10 rating, from -1 (hated) to 1 (loved)"""
+    return (rating - 5.5) / 4.5
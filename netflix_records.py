@@ -0,0 +1,180 @@
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+_MISSING = object()
+
+
+class Vocabulary:
+    """Interns values as small int codes; the code of a value never changes"""
+
+    def __init__(self):
+        self.codes: Dict[Hashable, int] = {}
+        self.values: List[Hashable] = []
+        self._lock = threading.Lock()
+
+    def code(self, value: Hashable) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    # Publish the value before its code so readers never see a dangling code
+                    self.values.append(value)
+                    code = self.codes[value] = len(self.values) - 1
+        return code
+
+    def value(self, code: int) -> Hashable:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+# Shared by every catalog: genre and tag lists repeat across movies as whole combinations
+CATEGORIES = Vocabulary()
+GENRE_SETS = Vocabulary()
+TAG_SETS = Vocabulary()
+
+# Content features ("genre:Drama", "category:Classic", "tag:heist") and each movie's set of their codes
+FEATURES = Vocabulary()
+FEATURE_SETS = Vocabulary()
+
+
+def movie_features(movie: Mapping) -> List[str]:
+    """Names of the content features a movie has"""
+    names = [f"genre:{genre}" for genre in movie.get("genre", ())]
+    if "category" in movie:
+        names.append(f"category:{movie['category']}")
+    return names + [f"tag:{tag}" for tag in dict.fromkeys(movie.get("tags", ()))]
+
+
+class MovieRecord(Mapping):
+    """Read-only, dict-shaped movie with interned category, genres and tags.
+
+    Genres and tags read back as tuples shared by every movie with the same
+    combination, so they cost one small int per movie. Keys outside FIELDS
+    are kept in a side dict. features holds the codes of the movie's content
+    features, for scoring against preference vectors.
+    """
+
+    FIELDS = ("id", "title", "genre", "year", "rating", "duration", "category", "description", "tags")
+    __slots__ = ("id", "title", "year", "rating", "duration", "description", "_genre", "_category", "_tags", "_extra",
+                 "_features")
+
+    def __init__(self, movie: Mapping):
+        get = movie.get
+        self.id = get("id", _MISSING)
+        self.title = get("title", _MISSING)
+        self.year = get("year", _MISSING)
+        self.rating = get("rating", _MISSING)
+        self.duration = get("duration", _MISSING)
+        self.description = get("description", _MISSING)
+        self._genre = GENRE_SETS.code(tuple(movie["genre"])) if "genre" in movie else _MISSING
+        self._category = CATEGORIES.code(movie["category"]) if "category" in movie else _MISSING
+        self._tags = TAG_SETS.code(tuple(movie["tags"])) if "tags" in movie else _MISSING
+        extra = {key: value for key, value in movie.items() if key not in self.FIELDS}
+        self._extra = extra or None
+        self._features = FEATURE_SETS.code(tuple(FEATURES.code(name) for name in movie_features(movie)))
+
+    @classmethod
+    def of(cls, movie: Mapping) -> "MovieRecord":
+        return movie if isinstance(movie, cls) else cls(movie)
+
+    @property
+    def features(self) -> Tuple[int, ...]:
+        return FEATURE_SETS.values[self._features]
+
+    def __getitem__(self, key: str):
+        if key == "genre":
+            value = self._genre if self._genre is _MISSING else GENRE_SETS.values[self._genre]
+        elif key == "category":
+            value = self._category if self._category is _MISSING else CATEGORIES.values[self._category]
+        elif key == "tags":
+            value = self._tags if self._tags is _MISSING else TAG_SETS.values[self._tags]
+        elif key in self.FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self._extra.get(key, _MISSING) if self._extra else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if key in self:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __reduce__(self):
+        # Codes are only meaningful within one process, so pickle the plain fields
+        return MovieRecord, (dict(self),)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ViewingHistory(Sequence):
+    """One user's watch records as packed columns: movie id, epoch seconds and completion byte.
+
+    Indexing returns the familiar {"movie_id", "watched_date",
+    "completion_percentage"} dict, built on access; watched dates keep
+    whole-second precision. Columns are appended in order and the length is
+    taken from the last one, so a lock-free reader never sees a torn record.
+    """
+
+    __slots__ = ("movie_ids", "timestamps", "completions")
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        self.movie_ids = array("q")
+        self.timestamps = array("q")
+        self.completions = array("B")
+        self.extend(records)
+
+    def append(self, record: Dict) -> None:
+        # Every value is converted before any column grows, so a bad record leaves the history intact
+        movie_id = array("q", [record["movie_id"]])
+        timestamp = int(record["watched_date"].timestamp())
+        completion = min(max(int(record["completion_percentage"]), 0), 255)
+        self.movie_ids.extend(movie_id)
+        self.timestamps.append(timestamp)
+        self.completions.append(completion)
+
+    def extend(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.completions)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._record(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(len(self))[index]]
+        return self._record(range(len(self))[index])
+
+    def _record(self, i: int) -> Dict:
+        return {"movie_id": self.movie_ids[i], "watched_date": datetime.fromtimestamp(self.timestamps[i]),
+                "completion_percentage": self.completions[i]}
+
+    def watched_ids(self) -> set:
+        return set(self.movie_ids[:len(self)])
+
+    def __repr__(self) -> str:
+        return f"ViewingHistory({self[:]!r})"
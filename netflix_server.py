@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+from collections.abc import Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_storage import SQLiteStorage
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def _json_default(value: object) -> object:
+    # Movies are dict-shaped records; everything else non-JSON (dates) is sent as text
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+class RecommenderServer:
+    """Asyncio HTTP/1.1 JSON front-end for a NetflixMovieRecommender.
+
+    Recommender calls run on a thread pool so scoring never blocks the event
+    loop; the recommender is safe to share between those threads. Identical
+    GET requests that arrive while one is already being computed wait for
+    that computation instead of starting their own.
+    """
+
+    def __init__(self, recommender: NetflixMovieRecommender, executor: Optional[Executor] = None):
+        self.recommender = recommender
+        self.recommender.quiet = True
+        self.executor = executor or ThreadPoolExecutor(max_workers=os.cpu_count())
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        self.routes = {
+            ("GET", "/recommendations"): self._recommendations,
+            ("GET", "/search"): self._search,
+            ("GET", "/stats"): self._stats,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/profile"): self._profile,
+            ("POST", "/watch"): self._watch,
+            ("POST", "/rate"): self._rate,
+            ("POST", "/watchlist"): self._watchlist,
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, object]:
+        """Route one request and return (HTTP status, JSON payload)"""
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            allowed = [m for m, path in self.routes if path == url.path]
+            return (405, {"error": "method not allowed"}) if allowed else (404, {"error": "not found"})
+
+        try:
+            if method == "GET":
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                key = (url.path, tuple(sorted(params.items())))
+                return await self._coalesced(key, handler, params)
+            params = json.loads(body or b"{}")
+            return await self._run(handler, params)
+        except (KeyError, ValueError, TypeError) as error:
+            return 400, {"error": f"invalid request: {error}"}
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+    async def _coalesced(self, key: Tuple, handler, params: Dict) -> Tuple[int, object]:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._run(handler, params))
+        self._in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _run(self, handler, params: Dict) -> Tuple[int, object]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, handler, params)
+
+    def _recommendations(self, params: Dict) -> Tuple[int, object]:
+        username = params["username"]
+        if username not in self.recommender.user_profiles:
+            return 404, {"status": "user_not_found"}
+        return 200, self.recommender.get_recommendations(username, params.get("type", "for_you"))
+
+    def _search(self, params: Dict) -> Tuple[int, object]:
+        filters = {}
+        if "genre" in params:
+            filters["genre"] = params["genre"].split(",")
+        if "category" in params:
+            filters["category"] = params["category"]
+        if "rating_min" in params:
+            filters["rating_min"] = float(params["rating_min"])
+        if "year_min" in params or "year_max" in params:
+            filters["year_range"] = (int(params.get("year_min", 0)), int(params.get("year_max", 9999)))
+        limit = int(params.get("limit", 20))
+        return 200, self.recommender.search_movies(params.get("q", ""), filters or None, limit)
+
+    def _stats(self, params: Dict) -> Tuple[int, object]:
+        stats = self.recommender.get_user_stats(params["username"])
+        if not stats:
+            return 404, {"status": "user_not_found"}
+        if "period" in params:
+            stats = dict(stats, hours_watched=self.recommender.get_watch_time(params["username"], params["period"]))
+        return 200, stats
+
+    def _metrics(self, params: Dict) -> Tuple[int, object]:
+        """Prometheus text, or the snapshot dict with format=json"""
+        metrics = self.recommender.metrics
+        if metrics is None:
+            return 404, {"error": "instrumentation is disabled"}
+        return 200, metrics.snapshot() if params.get("format") == "json" else metrics.prometheus()
+
+    def _profile(self, params: Dict) -> Tuple[int, object]:
+        username = params["username"]
+        preferences = params.get("preferences", {})
+        if not isinstance(preferences, dict):
+            raise TypeError("preferences must be an object")
+        if username in self.recommender.user_profiles:
+            status = self.recommender.update_user_profile(username, preferences)
+        else:
+            status = self.recommender.create_user_profile(username, preferences)
+        return self._mutation(status)
+
+    def _watch(self, params: Dict) -> Tuple[int, object]:
+        return self._mutation(self.recommender.watch_movie(params["username"], int(params["movie_id"])))
+
+    def _rate(self, params: Dict) -> Tuple[int, object]:
+        status = self.recommender.rate_movie(params["username"], int(params["movie_id"]), float(params["rating"]))
+        return self._mutation(status)
+
+    def _watchlist(self, params: Dict) -> Tuple[int, object]:
+        if params.get("action", "add") == "remove":
+            status = self.recommender.remove_from_watchlist(params["username"], int(params["movie_id"]))
+        else:
+            status = self.recommender.add_to_watchlist(params["username"], int(params["movie_id"]))
+        return self._mutation(status)
+
+    @staticmethod
+    def _mutation(status: str) -> Tuple[int, object]:
+        if status in ("user_not_found", "movie_not_found"):
+            return 404, {"status": status}
+        if status == "invalid_rating":
+            return 400, {"status": status}
+        return 200, {"status": status}
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict, bytes]]:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: object, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=_json_default).encode(), "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode() + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Netflix movie recommender over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", help="SQLite database for persistent state (in-memory if omitted)")
+    parser.add_argument("--metrics", action="store_true", help="record metrics and serve them at /metrics")
+    parser.add_argument("--slow-ms", type=float, help="with --metrics, profile sampled calls slower than this")
+    parser.add_argument("--similarity-index", metavar="PATH",
+                        help="load the neighbour index from PATH, or build it at startup and save it there")
+    args = parser.parse_args()
+
+    storage = SQLiteStorage(args.db) if args.db else None
+    recommender = NetflixMovieRecommender(storage=storage, quiet=True)
+    if args.similarity_index:
+        recommender.build_similarity_index(args.similarity_index)
+    if args.metrics:
+        recommender.enable_instrumentation(args.slow_ms / 1000 if args.slow_ms is not None else None)
+    # Stop on SIGTERM as on Ctrl-C, so buffered writes are committed on the way out
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(RecommenderServer(recommender).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recommender.close()
+
+
+if __name__ == "__main__":
+    main()
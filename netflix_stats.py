@@ -0,0 +1,64 @@
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PERIODS = ("week", "month")
+
+
+def period_key(watched_date: datetime, period: str) -> str:
+    """Bucket label: ISO week ("2024-W07") or calendar month ("2024-02")"""
+    if period == "week":
+        year, week, _ = watched_date.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "month":
+        return f"{watched_date.year}-{watched_date.month:02d}"
+    raise ValueError(f"unknown period: {period}")
+
+
+class UserStats:
+    """Running viewing aggregates for one user.
+
+    Each watch or rating updates the totals, the per-genre counters and the
+    per-week and per-month minutes in time independent of history length, so
+    reading the stats never rescans the history. Minutes use a movie's
+    duration at the time it was watched.
+    """
+
+    def __init__(self):
+        self.movies_watched = 0
+        self.minutes = 0
+        self.genre_counts: Dict[str, int] = {}
+        self.rating_sum = 0.0
+        self.rating_count = 0
+        self.minutes_by_period: Dict[str, Dict[str, int]] = {period: {} for period in PERIODS}
+
+    def add_watch(self, movie: Dict, watched_date: datetime) -> None:
+        self.movies_watched += 1
+        self.minutes += movie["duration"]
+        for genre in movie["genre"]:
+            self.genre_counts[genre] = self.genre_counts.get(genre, 0) + 1
+        for period, buckets in self.minutes_by_period.items():
+            key = period_key(watched_date, period)
+            buckets[key] = buckets.get(key, 0) + movie["duration"]
+
+    def add_rating(self, rating: float, previous: Optional[float] = None) -> None:
+        """Count a rating; previous is the user's earlier rating of the same movie, which it replaces"""
+        if previous is None:
+            self.rating_count += 1
+        else:
+            self.rating_sum -= previous
+        self.rating_sum += rating
+
+    def top_genres(self, k: int = 3) -> List[str]:
+        """Most watched genres; ties keep the order genres were first watched in"""
+        return [genre for genre, _ in heapq.nlargest(k, self.genre_counts.items(), key=lambda item: item[1])]
+
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+    def hours_by(self, period: str) -> Dict[str, float]:
+        """Hours watched per week or month, oldest bucket first"""
+        if period not in self.minutes_by_period:
+            raise ValueError(f"unknown period: {period}")
+        buckets = self.minutes_by_period[period]
+        return {key: round(buckets[key] / 60, 1) for key in sorted(buckets)}
@@ -0,0 +1,258 @@
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StorageBackend:
+    """Storage interface for catalog and per-user state.
+
+    The base class keeps nothing, so all state lives only in memory for the
+    lifetime of the process. Persistent backends override every method.
+    """
+
+    def load_movies(self) -> List[Dict]:
+        return []
+
+    def save_movie(self, movie: Dict) -> None:
+        pass
+
+    def usernames(self) -> List[str]:
+        """Every user with a stored profile"""
+        return []
+
+    def load_profile(self, username: str) -> Optional[Dict]:
+        return None
+
+    def save_profile(self, username: str, profile: Dict) -> None:
+        pass
+
+    def load_history(self, username: str) -> List[Dict]:
+        return []
+
+    def append_watch(self, username: str, record: Dict) -> None:
+        pass
+
+    def append_watches(self, rows: List[Tuple[str, Dict]]) -> None:
+        """Bulk form of append_watch for (username, record) pairs"""
+        for username, record in rows:
+            self.append_watch(username, record)
+
+    def load_ratings(self, username: str) -> Dict[int, float]:
+        return {}
+
+    def save_rating(self, username: str, movie_id: int, rating: float) -> None:
+        pass
+
+    def save_ratings(self, rows: List[Tuple[str, int, float]]) -> None:
+        """Bulk form of save_rating for (username, movie_id, rating) rows"""
+        for username, movie_id, rating in rows:
+            self.save_rating(username, movie_id, rating)
+
+    def load_watchlist(self, username: str) -> List[int]:
+        return []
+
+    def add_to_watchlist(self, username: str, movie_id: int) -> None:
+        pass
+
+    def remove_from_watchlist(self, username: str, movie_id: int) -> None:
+        pass
+
+    def remove_from_watchlists(self, rows: List[Tuple[str, int]]) -> None:
+        """Bulk form of remove_from_watchlist for (username, movie_id) rows"""
+        for username, movie_id in rows:
+            self.remove_from_watchlist(username, movie_id)
+
+    def reset_user(self, username: str) -> None:
+        """Drop a user's history, ratings and watchlist; the profile is kept"""
+        pass
+
+    def flush(self) -> None:
+        """Write out any buffered changes"""
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite storage with WAL journaling and batched writes.
+
+    Writes are executed at once inside an open transaction and committed
+    together once batch_size rows are pending, or by a background timer
+    flush_interval seconds after the first uncommitted write, so single events
+    do not each pay for a commit and an idle process loses at most
+    flush_interval seconds of writes. Reads on the same connection already see
+    uncommitted writes, so they never force a commit.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movies (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS profiles (username TEXT PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS viewing_history (
+            username TEXT NOT NULL, movie_id INTEGER NOT NULL,
+            watched_date TEXT NOT NULL, completion_percentage INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS viewing_history_user ON viewing_history (username);
+        CREATE TABLE IF NOT EXISTS ratings (
+            username TEXT NOT NULL, movie_id INTEGER NOT NULL, rating REAL NOT NULL,
+            PRIMARY KEY (username, movie_id));
+        CREATE TABLE IF NOT EXISTS watchlist (
+            username TEXT NOT NULL, movie_id INTEGER NOT NULL,
+            PRIMARY KEY (username, movie_id));
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+
+    def load_movies(self) -> List[Dict]:
+        return [json.loads(data) for (data,) in self._query("SELECT data FROM movies ORDER BY rowid")]
+
+    def save_movie(self, movie: Dict) -> None:
+        self._write("INSERT OR REPLACE INTO movies (id, data) VALUES (?, ?)", (movie["id"], json.dumps(dict(movie))))
+
+    def usernames(self) -> List[str]:
+        return [username for (username,) in self._query("SELECT username FROM profiles")]
+
+    def load_profile(self, username: str) -> Optional[Dict]:
+        rows = self._query("SELECT data FROM profiles WHERE username = ?", (username,))
+        if not rows:
+            return None
+        profile = json.loads(rows[0][0])
+        profile["created_date"] = datetime.fromisoformat(profile["created_date"])
+        return profile
+
+    def save_profile(self, username: str, profile: Dict) -> None:
+        data = dict(profile, created_date=profile["created_date"].isoformat())
+        self._write("INSERT OR REPLACE INTO profiles (username, data) VALUES (?, ?)", (username, json.dumps(data)))
+
+    def load_history(self, username: str) -> List[Dict]:
+        rows = self._query("SELECT movie_id, watched_date, completion_percentage FROM viewing_history "
+                           "WHERE username = ? ORDER BY rowid", (username,))
+        return [{"movie_id": movie_id, "watched_date": datetime.fromisoformat(watched_date),
+                 "completion_percentage": completion} for movie_id, watched_date, completion in rows]
+
+    def append_watch(self, username: str, record: Dict) -> None:
+        self.append_watches([(username, record)])
+
+    def append_watches(self, rows: List[Tuple[str, Dict]]) -> None:
+        self._write_many("INSERT INTO viewing_history (username, movie_id, watched_date, completion_percentage) "
+                         "VALUES (?, ?, ?, ?)",
+                         [(username, record["movie_id"], record["watched_date"].isoformat(),
+                           record["completion_percentage"]) for username, record in rows])
+
+    def load_ratings(self, username: str) -> Dict[int, float]:
+        rows = self._query("SELECT movie_id, rating FROM ratings WHERE username = ? ORDER BY rowid", (username,))
+        return dict(rows)
+
+    def save_rating(self, username: str, movie_id: int, rating: float) -> None:
+        self.save_ratings([(username, movie_id, rating)])
+
+    def save_ratings(self, rows: List[Tuple[str, int, float]]) -> None:
+        self._write_many("INSERT OR REPLACE INTO ratings (username, movie_id, rating) VALUES (?, ?, ?)", rows)
+
+    def load_watchlist(self, username: str) -> List[int]:
+        rows = self._query("SELECT movie_id FROM watchlist WHERE username = ? ORDER BY rowid", (username,))
+        return [movie_id for (movie_id,) in rows]
+
+    def add_to_watchlist(self, username: str, movie_id: int) -> None:
+        self._write("INSERT OR IGNORE INTO watchlist (username, movie_id) VALUES (?, ?)", (username, movie_id))
+
+    def remove_from_watchlist(self, username: str, movie_id: int) -> None:
+        self.remove_from_watchlists([(username, movie_id)])
+
+    def remove_from_watchlists(self, rows: List[Tuple[str, int]]) -> None:
+        self._write_many("DELETE FROM watchlist WHERE username = ? AND movie_id = ?", rows)
+
+    def reset_user(self, username: str) -> None:
+        for table in ("viewing_history", "ratings", "watchlist"):
+            self._write(f"DELETE FROM {table} WHERE username = ?", (username,))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        self._write_many(sql, [params])
+
+    def _write_many(self, sql: str, rows: List[tuple]) -> None:
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._pending_rows += len(rows)
+            if (self._pending_rows >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending_rows:
+            self._conn.commit()
+            self._pending_rows = 0
+
+
+class LazyUserMap(MutableMapping):
+    """Per-user state that is loaded from storage the first time a user is touched.
+
+    Iteration and len() only cover users already loaded into memory.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[object]]):
+        self._loader = loader
+        self._loaded: Dict[str, object] = {}
+        self.loads = 0
+
+    def __getitem__(self, username: str):
+        try:
+            return self._loaded[username]
+        except KeyError:
+            self.loads += 1
+            value = self._loader(username)
+            if value is None:
+                raise
+            # If another thread loaded the same user meanwhile, keep its copy
+            return self._loaded.setdefault(username, value)
+
+    def peek(self, username: str):
+        """The user's state if already loaded, else None; never loads"""
+        return self._loaded.get(username)
+
+    def __setitem__(self, username: str, value) -> None:
+        self._loaded[username] = value
+
+    def __delitem__(self, username: str) -> None:
+        del self._loaded[username]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaded)
+
+    def __len__(self) -> int:
+        return len(self._loaded)
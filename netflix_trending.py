@@ -0,0 +1,141 @@
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch; estimates never undercount"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0.0] * width for _ in range(depth)]
+
+    def add(self, key: int, amount: float) -> float:
+        """Add amount to key and return its new estimate"""
+        estimate = math.inf
+        for seed, row in enumerate(self._rows):
+            cell = hash((seed, key)) % self.width
+            row[cell] += amount
+            estimate = min(estimate, row[cell])
+        return estimate
+
+    def scale(self, factor: float) -> None:
+        for row in self._rows:
+            row[:] = [value * factor for value in row]
+
+
+class DecayedTopK:
+    """Approximate top-k movies by exponentially time-decayed watch count.
+
+    Each event adds 2 ** ((t - t0) / half_life) to its movie, so older events
+    weigh relatively less without a decay pass; t0 is moved forward before the
+    weights grow large. Counts live in a count-min sketch and only the
+    `capacity` heaviest movies are tracked, so memory does not grow with the
+    number of distinct titles.
+    """
+
+    def __init__(self, half_life: float, capacity: int = 256, width: int = 2048, depth: int = 4):
+        self.half_life = half_life
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth)
+        self._origin: Optional[float] = None
+        self._scores: Dict[int, float] = {}
+        self._heap: List[tuple] = []
+        self._ranking: Optional[List[int]] = None
+
+    def add(self, movie_id: int, timestamp: float) -> None:
+        if self._origin is None:
+            self._origin = timestamp
+        exponent = (timestamp - self._origin) / self.half_life
+        if exponent > 64:
+            self._rebase(timestamp)
+            exponent = 0.0
+        estimate = self.sketch.add(movie_id, 2.0 ** exponent)
+
+        if movie_id in self._scores or len(self._scores) < self.capacity:
+            self._track(movie_id, estimate)
+        else:
+            lowest_score, lowest_id = self._lowest()
+            if estimate > lowest_score:
+                del self._scores[lowest_id]
+                self._track(movie_id, estimate)
+
+    def top(self, k: int) -> List[int]:
+        """Movie ids with the highest decayed counts, best first"""
+        if self._ranking is None:
+            self._ranking = [movie_id for movie_id, _ in
+                             heapq.nlargest(self.capacity, self._scores.items(), key=lambda item: item[1])]
+        return self._ranking[:k]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _track(self, movie_id: int, score: float) -> None:
+        self._scores[movie_id] = score
+        heapq.heappush(self._heap, (score, movie_id))
+        self._ranking = None
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(s, m) for m, s in self._scores.items()]
+            heapq.heapify(self._heap)
+
+    def _lowest(self) -> tuple:
+        """Smallest tracked entry, discarding heap entries that are out of date"""
+        while True:
+            score, movie_id = self._heap[0]
+            if self._scores.get(movie_id) == score:
+                return score, movie_id
+            heapq.heappop(self._heap)
+
+    def _rebase(self, timestamp: float) -> None:
+        factor = 2.0 ** (-(timestamp - self._origin) / self.half_life)
+        self._origin = timestamp
+        self.sketch.scale(factor)
+        self._scores = {movie_id: score * factor for movie_id, score in self._scores.items()}
+        self._heap = [(s, m) for m, s in self._scores.items()]
+        heapq.heapify(self._heap)
+
+
+class TrendingEngine:
+    """Streaming trending rows overall, per genre and per category; safe to share between threads"""
+
+    def __init__(self, half_life_hours: float = 24.0, capacity: int = 256):
+        self.half_life = half_life_hours * 3600
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._overall = DecayedTopK(self.half_life, capacity)
+        self._by_genre: Dict[str, DecayedTopK] = {}
+        self._by_category: Dict[str, DecayedTopK] = {}
+
+    def record(self, movie: Dict, watched_date: datetime) -> None:
+        """Count one viewing of movie at watched_date"""
+        # A future date would move the decay origin ahead and bury every real viewing
+        timestamp = min(watched_date.timestamp(), time.time())
+        with self._lock:
+            self._overall.add(movie["id"], timestamp)
+            for genre in movie["genre"]:
+                self._row(self._by_genre, genre).add(movie["id"], timestamp)
+            self._row(self._by_category, movie["category"]).add(movie["id"], timestamp)
+
+    def top(self, k: int, genre: Optional[str] = None, category: Optional[str] = None) -> List[int]:
+        """Trending movie ids overall, or within one genre or category"""
+        if genre is not None:
+            row = self._by_genre.get(genre)
+        elif category is not None:
+            row = self._by_category.get(category)
+        else:
+            row = self._overall
+        if row is None:
+            return []
+        with self._lock:
+            return row.top(k)
+
+    def _row(self, rows: Dict[str, DecayedTopK], key: str) -> DecayedTopK:
+        row = rows.get(key)
+        if row is None:
+            # Per-genre and per-category rows need less resolution than the overall row
+            row = rows[key] = DecayedTopK(self.half_life, self.capacity, width=512)
+        return row
@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bench_suite import SyntheticStorage, generate_users
+from netflix_movie import NetflixMovieRecommender
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(5000, 1), quiet=True)
+    for username, preferences in generate_users(40, 2):
+        recommender.create_user_profile(username, preferences)
+    recommender.build_ann_index(target_recall=0.9)
+    return recommender
+
+
+def test_indexes_reach_the_recall_target(recommender):
+    for index in recommender.ann_indexes.values():
+        assert index.recall >= 0.9
+        queries = np.array([index.query_vector(recommender._ann_query(u, "for_you")) for u in list(recommender.preferences)[:10]])
+        assert index.recall_at_k(queries, recommender.ann_candidates) >= 0.8
+
+
+def test_top_picks_candidates_are_prefiltered_by_rating(recommender):
+    candidates = recommender._retrieve_candidates("user0000000", "top_picks")
+    assert candidates and all(movie["rating"] >= 8.0 for movie in candidates)
+
+
+@pytest.mark.parametrize("recommendation_type", ["for_you", "top_picks"])
+def test_retrieved_recommendations_overlap_exact_ones(recommender, recommendation_type):
+    rank = {"for_you": recommender._get_personalized_recommendations, "top_picks": recommender._get_top_picks}
+    overlap = []
+    for username in list(recommender.preferences):
+        candidates = recommender._retrieve_candidates(username, recommendation_type)
+        approximate = {movie["id"] for movie in rank[recommendation_type](username, candidates)}
+        exact = {movie["id"] for movie in rank[recommendation_type](username)}
+        overlap.append(len(approximate & exact) / len(exact))
+    assert sum(overlap) / len(overlap) >= 0.9
+
+
+def test_saved_index_loads_memory_mapped(recommender, tmp_path):
+    recommender.save_ann_index(str(tmp_path))
+    expected = recommender._retrieve_candidates("user0000001", "for_you")
+
+    reloaded = NetflixMovieRecommender(storage=SyntheticStorage(5000, 1), quiet=True)
+    reloaded.create_user_profile("user0000001", recommender.user_profiles["user0000001"])
+    assert reloaded.load_ann_index(str(tmp_path)) == "loaded"
+    assert isinstance(reloaded.ann_indexes["for_you"].vectors, np.memmap)
+    assert reloaded.ann_indexes.keys() == recommender.ann_indexes.keys()
+    assert reloaded._retrieve_candidates("user0000001", "for_you") == expected
+
+
+def test_index_saved_for_another_catalog_is_not_loaded(recommender, tmp_path):
+    recommender.save_ann_index(str(tmp_path))
+
+    changed = NetflixMovieRecommender(storage=SyntheticStorage(5000, 1), quiet=True)
+    changed.movies.add(dict(changed.movies.get(1), id=99999, title="A Sequel"))
+    assert changed.load_ann_index(str(tmp_path)) == "stale_ann_index"
+    assert changed.ann_indexes == {}
+    assert changed._retrieve_candidates("user0000001", "for_you") is None
@@ -0,0 +1,86 @@
+import netflix_cache
+from netflix_cache import RecommendationCache
+from netflix_movie import NetflixMovieRecommender
+
+
+def movies(*ids):
+    return [{"id": movie_id} for movie_id in ids]
+
+
+def test_user_writes_invalidate_only_that_users_entries():
+    recommender = NetflixMovieRecommender(quiet=True)
+    cache = recommender.recommendation_cache
+    for username in ("alice", "bob"):
+        recommender.create_user_profile(username, {"favorite_genres": ["Drama"]})
+
+    writes = [
+        lambda: recommender.watch_movie("alice", 1),
+        lambda: recommender.rate_movie("alice", 2, 9),
+        lambda: recommender.update_user_profile("alice", {"favorite_genres": ["Comedy"]}),
+    ]
+    for write in writes:
+        for username in ("alice", "bob"):
+            recommender.get_recommendations(username, "for_you")
+        hits = cache.stats()["hits"]
+        write()
+        recommender.get_recommendations("bob", "for_you")
+        assert cache.stats()["hits"] == hits + 1
+        assert cache.get(("alice", "for_you")) is None
+    assert cache.stats()["invalidations"] == len(writes)
+
+
+def test_new_releases_are_cached_once_for_every_user():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.new_release_years = 10
+    for username in ("alice", "bob"):
+        recommender.create_user_profile(username, {})
+    first = recommender.get_recommendations("alice", "new_releases")
+    recommender.watch_movie("alice", 1)
+    assert recommender.get_recommendations("bob", "new_releases") == first
+    stats = recommender.recommendation_cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_results_computed_before_an_invalidation_are_dropped():
+    cache = RecommendationCache()
+    token = cache.token("alice")
+    cache.invalidate_user("alice")
+    cache.put(("alice", "for_you"), movies(1), "alice", token)
+    assert cache.get(("alice", "for_you")) is None
+
+    token = cache.token(None)
+    cache.clear()
+    cache.put((None, "new_releases"), movies(1), None, token)
+    assert cache.get((None, "new_releases")) is None
+
+    cache.put(("alice", "for_you"), movies(2), "alice", cache.token("alice"))
+    assert cache.get(("alice", "for_you")) == movies(2)
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(netflix_cache.time, "monotonic", lambda: now[0])
+    cache = RecommendationCache(ttl=60)
+    cache.put("key", movies(1))
+    now[0] += 59
+    assert cache.get("key") == movies(1)
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_by_total_length():
+    cache = RecommendationCache(max_items=5, ttl=None)
+    cache.put("a", movies(1, 2))
+    cache.put("b", movies(3, 4))
+    cache.get("a")
+    cache.put("c", movies(5, 6))
+    assert cache.get("b") is None
+    assert cache.get("a") == movies(1, 2) and cache.get("c") == movies(5, 6)
+    cache.put("too long", movies(*range(6)))
+    assert cache.get("too long") is None
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["items"], stats["evictions"]) == (2, 4, 1)
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+    assert stats["hit_rate"] == 3 / 5
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import netflix_movie
+from bench_suite import generate_events, generate_users
+from netflix_movie import NetflixMovieRecommender
+from netflix_storage import SQLiteStorage
+
+
+def test_training_does_not_keep_stored_users_in_memory(tmp_path):
+    path = str(tmp_path / "state.db")
+    recommender = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    users = list(generate_users(20, 1))
+    for username, preferences in users:
+        recommender.create_user_profile(username, preferences)
+    recommender.ingest_events(generate_events([u for u, _ in users], 30, 2))
+    recommender.train_collaborative_model(factors=4, iterations=2)
+    expected = recommender.get_recommendations(users[0][0], "collaborative")
+    recommender.close()
+
+    reopened = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    reopened.train_collaborative_model(factors=4, iterations=2)
+    assert all(reopened.collaborative_model.has_user(username) for username, _ in users)
+    assert len(reopened.viewing_history) == len(reopened.ratings) == 0
+    assert reopened.get_recommendations(users[0][0], "collaborative") == expected
+    reopened.close()
+
+
+def recording_fold_ins(model):
+    folded = []
+    fold_in = model.fold_in
+
+    def record(username, preferences, version=None):
+        folded.append((username, set(preferences)))
+        fold_in(username, preferences, version)
+
+    model.fold_in = record
+    return folded
+
+
+def test_event_during_training_is_folded_into_the_new_model(monkeypatch):
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {"favorite_genres": ["Drama"]})
+    recommender.create_user_profile("bob", {"favorite_genres": ["Action"]})
+    recommender.watch_movie("alice", 1)
+    recommender.watch_movie("bob", 2)
+    recommender.train_collaborative_model(factors=4, iterations=2)
+
+    class RacingModel(netflix_movie.CollaborativeFilteringModel):
+        def fit(self, preferences, versions=None):
+            # The training data has been read: this event and a fold-in into the old model race it
+            recommender.watch_movie("alice", 5)
+            recommender.get_recommendations("alice", "collaborative")
+            return super().fit(preferences, versions)
+
+    monkeypatch.setattr(netflix_movie, "CollaborativeFilteringModel", RacingModel)
+    recommender.train_collaborative_model(factors=4, iterations=2)
+    folded = recording_fold_ins(recommender.collaborative_model)
+    recommender.get_recommendations("alice", "collaborative")
+    recommender.get_recommendations("bob", "collaborative")
+    assert folded == [("alice", {1, 5})]
+
+    recommender.rate_movie("bob", 3, 8)
+    recommender.get_recommendations("bob", "collaborative")
+    recommender.get_recommendations("bob", "collaborative")
+    assert folded[1:] == [("bob", {2, 3})]
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_records import ViewingHistory
+
+
+def make_recommender():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {"favorite_genres": ["Drama"]})
+    return recommender
+
+
+def test_out_of_range_numbers_are_rejected_not_raised():
+    recommender = make_recommender()
+    lines = [
+        '{"type": "watch", "username": "alice", "movie_id": 1e400}',
+        '{"type": "watch", "username": "alice", "movie_id": 1, "completion_percentage": 1e400}',
+        '{"type": "watch", "username": "alice", "movie_id": 1, "watched_date": 1e20}',
+        '{"type": "watch", "username": "alice", "movie_id": 2}',
+    ]
+    report = recommender.ingest_events((json.loads(line) for line in lines), chunk_size=2)
+    assert report["watches"] == 1
+    assert report["rejects"] == {"malformed": 3}
+    assert list(recommender.viewing_history["alice"].movie_ids) == [2]
+
+
+def test_watched_dates_that_are_not_dates_are_rejected():
+    recommender = make_recommender()
+    events = [{"type": "watch", "username": "alice", "movie_id": 1, "watched_date": watched_date}
+              for watched_date in ([2020], {}, {"year": 2020}, "2020-01-02")]
+    events.append({"type": "watch", "username": "alice", "movie_id": 2, "watched_date": "2020-01-03"})
+    report = recommender.ingest_events(events)
+    assert report["rejects"] == {"malformed": 3}
+    history = recommender.viewing_history["alice"]
+    assert [(record["movie_id"], record["watched_date"].day) for record in history] == [(1, 2), (2, 3)]
+
+
+def test_a_record_that_fails_to_convert_leaves_the_history_intact():
+    history = ViewingHistory()
+    with pytest.raises(AttributeError):
+        history.append({"movie_id": 1, "watched_date": [2020], "completion_percentage": 100})
+    history.append({"movie_id": 2, "watched_date": datetime(2020, 1, 3), "completion_percentage": 100})
+    assert [record["movie_id"] for record in history] == [2]
+    assert len(history.movie_ids) == len(history.timestamps) == len(history.completions) == 1
+
+
+def test_completion_outside_percentage_range_is_rejected():
+    recommender = make_recommender()
+    events = [{"type": "watch", "username": "alice", "movie_id": 1, "completion_percentage": completion}
+              for completion in (250, -5, 0, 100)]
+    report = recommender.ingest_events(events)
+    assert report["rejects"] == {"invalid_completion": 2}
+    assert list(recommender.viewing_history["alice"].completions) == [0, 100]
+    assert recommender.user_stats["alice"].movies_watched == 2
+
+
+def test_future_dated_watches_are_rejected():
+    recommender = make_recommender()
+    events = [{"type": "watch", "username": "alice", "movie_id": 5, "watched_date": "2100-01-01"},
+              {"type": "watch", "username": "alice", "movie_id": 3}]
+    report = recommender.ingest_events(events)
+    assert report["rejects"] == {"invalid_date": 1}
+    assert list(recommender.viewing_history["alice"].movie_ids) == [3]
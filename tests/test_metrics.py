@@ -0,0 +1,46 @@
+import json
+import threading
+
+from netflix_metrics import Histogram, Instrumentation
+from netflix_movie import NetflixMovieRecommender
+
+
+def test_keyword_calls_behave_the_same_when_instrumented():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {"favorite_genres": ["Drama"]})
+    expected = recommender.get_recommendations_batch(usernames=["alice"], recommendation_type="top_picks")
+
+    metrics = recommender.enable_instrumentation()
+    assert recommender.get_recommendations_batch(usernames=["alice"], recommendation_type="top_picks") == expected
+    assert recommender.get_recommendations(username="alice") == recommender.get_recommendations("alice", "for_you")
+    calls = metrics.snapshot()["calls"]
+    assert calls["get_recommendations_batch:top_picks"]["count"] == 1
+    assert calls["get_recommendations:for_you"]["count"] == 2
+
+    recommender.disable_instrumentation()
+    assert "get_recommendations" not in vars(recommender)
+
+
+def test_snapshot_is_valid_json_with_observations_beyond_the_last_bucket():
+    histogram = Histogram()
+    histogram.observe(60.0)
+    assert histogram.quantile(0.99) == histogram.bounds[-1]
+
+    metrics = Instrumentation()
+    metrics.wrap("slow", lambda: None)()
+    metrics._observe(metrics._calls, ("slow", ""), 60.0)
+    json.dumps(metrics.snapshot(), allow_nan=False)
+
+
+def test_concurrent_sampled_calls_are_profiled_one_at_a_time():
+    metrics = Instrumentation(slow_threshold=0.0, profile_sample_rate=1.0)
+    barrier = threading.Barrier(2, timeout=5)
+    call = metrics.wrap("call", barrier.wait)
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.snapshot()["calls"]["call"]["count"] == 2
+    assert len(metrics.slow_profiles) == 1
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from bench_suite import SyntheticStorage, generate_events, generate_users
+from netflix_movie import NetflixMovieRecommender
+
+
+@pytest.fixture
+def recommender():
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(2000, 1), quiet=True)
+    for username, preferences in generate_users(30, 2):
+        recommender.create_user_profile(username, preferences)
+    recommender.ingest_events(generate_events(list(recommender.user_profiles), 2000, 3))
+    yield recommender
+    recommender.close()
+
+
+def test_process_pool_matches_in_process_batch(recommender):
+    usernames = list(recommender.user_profiles)
+    expected = {t: recommender.get_recommendations_batch(usernames, t)
+                for t in ("for_you", "because_you_watched", "top_picks")}
+    recommender.start_process_pool(workers=2)
+    for recommendation_type, results in expected.items():
+        assert recommender.get_recommendations_batch(usernames, recommendation_type) == results
+
+
+def test_catalog_change_during_scoring_does_not_break_other_threads(recommender):
+    usernames = list(recommender.user_profiles)
+    recommender.start_process_pool(workers=1)
+    errors = []
+
+    def score():
+        try:
+            for _ in range(5):
+                recommender.get_recommendations_batch(usernames, "for_you")
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=score) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for rating in (7.1, 7.2, 7.3, 7.4, 7.5, 7.6):
+        recommender.movies.update(1, rating=rating)
+        recommender.get_recommendations_batch(usernames[:1], "for_you")
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_preferences import PreferenceVector
+from netflix_records import FEATURES
+from netflix_storage import SQLiteStorage
+
+PREFERENCES = {"favorite_genres": ["Action", "Drama"], "disliked_genres": ["Horror"]}
+
+
+def open_recommender(path):
+    return NetflixMovieRecommender(storage=SQLiteStorage(str(path)), quiet=True)
+
+
+def test_rerating_matches_vector_rebuilt_from_storage(tmp_path):
+    recommender = open_recommender(tmp_path / "state.db")
+    recommender.create_user_profile("alice", PREFERENCES)
+    for movie_id in (1, 4, 7):
+        recommender.watch_movie("alice", movie_id)
+    recommender.rate_movie("alice", 1, 9)
+    recommender.rate_movie("alice", 1, 3)
+    recommender.rate_movie("alice", 7, 2)
+    in_memory = recommender.preferences["alice"].weights()
+    recommendations = [m["id"] for m in recommender.get_recommendations("alice", "for_you")]
+    recommender.close()
+
+    reopened = open_recommender(tmp_path / "state.db")
+    rebuilt = reopened.preferences["alice"].weights()
+    assert rebuilt.keys() == in_memory.keys()
+    assert rebuilt == pytest.approx(in_memory, abs=1e-5)
+    assert [m["id"] for m in reopened.get_recommendations("alice", "for_you")] == recommendations
+    reopened.close()
+
+
+def test_rerating_replaces_earlier_rating():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("bob", PREFERENCES)
+    recommender.rate_movie("bob", 1, 9)
+    recommender.rate_movie("bob", 1, 3)
+    rerated = recommender.preferences["bob"].weights()
+
+    fresh = NetflixMovieRecommender(quiet=True)
+    fresh.create_user_profile("bob", PREFERENCES)
+    fresh.rate_movie("bob", 1, 3)
+    assert rerated == pytest.approx(fresh.preferences["bob"].weights(), abs=1e-5)
+
+
+def test_a_future_dated_event_does_not_erase_learned_weights():
+    vector = PreferenceVector()
+    movies = NetflixMovieRecommender(quiet=True).movies
+    vector.observe(movies.get(1), 1.0, datetime.now())
+    before = vector.weights()
+    vector.observe(movies.get(2), 1.0, datetime(2100, 1, 1))
+    after = vector.weights()
+    for feature in movies.get(1).features:
+        name = FEATURES.values[feature]
+        if name not in {FEATURES.values[f] for f in movies.get(2).features}:
+            assert after[name] == pytest.approx(before[name] / 2, abs=1e-5)
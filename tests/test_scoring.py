@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from bench_suite import SyntheticStorage, generate_events, generate_users
+from netflix_cache import RecommendationCache
+from netflix_movie import NetflixMovieRecommender
+
+SCORED_TYPES = ("for_you", "because_you_watched", "top_picks")
+
+
+def build(vectorized):
+    recommender = NetflixMovieRecommender(vectorized=vectorized, storage=SyntheticStorage(3000, 4), quiet=True)
+    recommender.recommendation_cache = RecommendationCache(max_items=0)
+    for username, preferences in generate_users(40, 5):
+        recommender.create_user_profile(username, preferences)
+    recommender.ingest_events(generate_events(list(recommender.user_profiles), 3000, 6))
+    return recommender
+
+
+@pytest.fixture(scope="module")
+def recommenders():
+    vectorized, scalar = build(True), build(False)
+    yield vectorized, scalar
+    vectorized.close()
+    scalar.close()
+
+
+def ids(movies):
+    return [movie["id"] for movie in movies]
+
+
+@pytest.mark.parametrize("recommendation_type", SCORED_TYPES)
+def test_vectorized_scalar_and_batch_paths_rank_alike(recommenders, recommendation_type):
+    vectorized, scalar = recommenders
+    usernames = sorted(vectorized.user_profiles)
+    batch = vectorized.get_recommendations_batch(usernames, recommendation_type)
+    for username in usernames:
+        expected = ids(scalar.get_recommendations(username, recommendation_type))
+        assert ids(vectorized.get_recommendations(username, recommendation_type)) == expected
+        assert ids(batch[username]) == expected
@@ -0,0 +1,79 @@
+import random
+import re
+
+import pytest
+
+from bench_suite import SyntheticStorage
+from netflix_movie import NetflixMovieRecommender
+
+
+def reference_search(catalog, query, filters=None, limit=20):
+    """Full scan with the index's ranking: word-start matches first, each group in catalog order"""
+    query = query.lower()
+    word_start = re.compile(r"(?<!\w)" + re.escape(query))
+    ranked, inner_matches = [], []
+    for movie in catalog:
+        texts = [movie["title"].lower()] + [g.lower() for g in movie["genre"]] + [t.lower() for t in movie["tags"]]
+        if not any(query in text for text in texts):
+            continue
+        if filters:
+            if "genre" in filters and not any(g in movie["genre"] for g in filters["genre"]):
+                continue
+            if "category" in filters and movie["category"] != filters["category"]:
+                continue
+            if "year_range" in filters and not filters["year_range"][0] <= movie["year"] <= filters["year_range"][1]:
+                continue
+            if "rating_min" in filters and movie["rating"] < filters["rating_min"]:
+                continue
+        (ranked if any(word_start.search(text) for text in texts) else inner_matches).append(movie)
+    return (ranked + inner_matches)[:limit]
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    return NetflixMovieRecommender(storage=SyntheticStorage(3000, 1), quiet=True)
+
+
+def queries(recommender, count=60):
+    rng = random.Random(0)
+    titles = [movie["title"] for movie in recommender.movies]
+    for _ in range(count):
+        title = rng.choice(titles).lower()
+        start = rng.randrange(len(title))
+        yield title[start:start + rng.randint(1, 7)]
+
+
+def test_search_matches_a_full_scan(recommender):
+    for query in list(queries(recommender)) + ["", "zzzz"]:
+        assert recommender.search_movies(query) == reference_search(recommender.movies, query), query
+
+
+def test_filters_match_a_full_scan(recommender):
+    filters = {"genre": ["Drama", "Comedy"], "year_range": (2000, 2020), "rating_min": 6.0}
+    for query in queries(recommender, 20):
+        assert recommender.search_movies(query, filters, 50) == reference_search(recommender.movies, query, filters, 50)
+
+
+@pytest.mark.parametrize("filters", [
+    {"rating_min": 9.5},
+    {"year_range": (1990, 1991)},
+    {"category": "Documentary", "year_range": (2010, 2012)},
+    {"genre": ["Documentary", "Horror"], "rating_min": 8.0},
+])
+def test_selective_filters_match_a_full_scan(recommender, filters):
+    for query in ["", "a", "ka", "the", "ers"] + list(queries(recommender, 10)):
+        assert recommender.search_movies(query, filters, 30) == \
+            reference_search(recommender.movies, query, filters, 30), (query, filters)
+
+
+def test_index_follows_catalog_edits():
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(500, 1), quiet=True)
+    recommender.movies.update(250, title="Quixotic Zebra")
+    recommender.movies.add({"id": 9999, "title": "Zebra Crossing", "genre": ["Drama"], "year": 2001,
+                            "rating": 7.0, "duration": 100, "category": "Classic", "tags": []})
+    recommender.movies.update(100, title="Zebra Stripes")
+    for query in ("zebra", "zeb", "ze", "quixotic"):
+        assert recommender.search_movies(query) == reference_search(recommender.movies, query)
+    assert [m["id"] for m in recommender.search_movies("zebra")][-3:] == [100, 250, 9999]
+    recommender.movies.update(250, rating=9.99)
+    assert recommender.search_movies("zebra", {"rating_min": 9.99}) == [recommender.movies.get(250)]
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_server import RecommenderServer
+
+
+@pytest.fixture
+def server():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {"favorite_genres": ["Drama"]})
+    server = RecommenderServer(recommender)
+    yield server
+    server.executor.shutdown()
+
+
+def call(server, method, target, body=None):
+    return asyncio.run(server.dispatch(method, target, json.dumps(body).encode() if body is not None else b""))
+
+
+def test_routes_and_status_codes(server):
+    assert call(server, "GET", "/nowhere") == (404, {"error": "not found"})
+    assert call(server, "POST", "/recommendations")[0] == 405
+    assert call(server, "GET", "/recommendations?username=nobody") == (404, {"status": "user_not_found"})
+    assert call(server, "GET", "/recommendations")[0] == 400
+
+    status, movies = call(server, "GET", "/recommendations?username=alice&type=top_picks")
+    assert status == 200 and movies == server.recommender.get_recommendations("alice", "top_picks")
+    status, movies = call(server, "GET", "/search?q=dark&rating_min=8.5&year_min=2000")
+    assert status == 200 and [movie["title"] for movie in movies] == ["The Dark Knight"]
+
+
+def test_mutations_map_their_status(server):
+    assert call(server, "POST", "/profile", {"username": "bob", "preferences": {"favorite_genres": ["Comedy"]}}) == \
+        (200, {"status": "created"})
+    assert call(server, "POST", "/profile", {"username": "bob", "preferences": {}}) == (200, {"status": "updated"})
+    assert call(server, "POST", "/watch", {"username": "bob", "movie_id": 1}) == (200, {"status": "recorded"})
+    assert call(server, "POST", "/watch", {"username": "bob", "movie_id": 999}) == (404, {"status": "movie_not_found"})
+    assert call(server, "POST", "/watch", {"username": "carol", "movie_id": 1}) == (404, {"status": "user_not_found"})
+    assert call(server, "POST", "/rate", {"username": "bob", "movie_id": 1, "rating": 11}) == \
+        (400, {"status": "invalid_rating"})
+    assert call(server, "POST", "/watchlist", {"username": "bob", "movie_id": 2}) == (200, {"status": "added"})
+    assert call(server, "POST", "/watchlist", {"username": "bob", "movie_id": 2, "action": "remove"}) == \
+        (200, {"status": "removed"})
+
+    status, stats = call(server, "GET", "/stats?username=bob&period=month")
+    assert status == 200 and stats["total_movies_watched"] == 1 and len(stats["hours_watched"]) == 1
+    assert call(server, "GET", "/stats?username=bob&period=year")[0] == 400
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/profile", b"not json"),
+    ("/profile", b"[1, 2]"),
+    ("/profile", b'{"username": "bob", "preferences": ["Drama"]}'),
+    ("/watch", b'{"username": "alice", "movie_id": "one"}'),
+    ("/rate", b'{"username": "alice", "movie_id": 1}'),
+])
+def test_malformed_bodies_are_bad_requests(server, path, body):
+    status, payload = asyncio.run(server.dispatch("POST", path, body))
+    assert status == 400 and payload["error"].startswith("invalid request")
+    assert "bob" not in server.recommender.user_profiles
+
+
+def test_concurrent_identical_gets_are_computed_once(server):
+    calls = []
+    get_recommendations = server.recommender.get_recommendations
+
+    def slow_get_recommendations(username, recommendation_type):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return get_recommendations(username, recommendation_type)
+
+    server.recommender.get_recommendations = slow_get_recommendations
+
+    async def requests():
+        same = [server.dispatch("GET", "/recommendations?username=alice&type=for_you", b"") for _ in range(5)]
+        other = server.dispatch("GET", "/recommendations?type=for_you&username=alice&x=1", b"")
+        return await asyncio.gather(*same, other)
+
+    responses = asyncio.run(requests())
+    assert len(calls) == 2
+    assert server.coalesced == 4
+    assert all(response == responses[0] and response[0] == 200 for response in responses)
+
+
+def test_http_round_trip_over_a_live_connection(server):
+    async def exchange():
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"username": "alice", "movie_id": 3}).encode()
+        writer.write(b"POST /watch HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        writer.write(b"GET /stats?username=alice HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response.decode()
+
+    response = asyncio.run(exchange())
+    first, second = response.split("HTTP/1.1 ")[1:]
+    assert first.startswith("200 OK") and '{"status": "recorded"}' in first
+    assert second.startswith("200 OK") and "Connection: close" in second
+    assert json.loads(second.split("\r\n\r\n", 1)[1])["total_movies_watched"] == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from bench_suite import GENRES, SyntheticStorage
+from netflix_movie import ItemSimilarityIndex, NetflixMovieRecommender, movie_similarity
+
+
+def neighbour_scores(index, catalog):
+    return {movie["id"]: [round(score, 9) for movie, score in index.neighbours(movie["id"])] for movie in catalog}
+
+
+def test_incremental_updates_match_a_rebuilt_index():
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(400, 2), quiet=True)
+    catalog = recommender.movies
+    recommender.build_similarity_index()
+
+    catalog.update(7, genre=[GENRES[0], GENRES[1]], rating=9.5)
+    catalog.update(19, director="Someone New", year=1990)
+    catalog.add(dict(catalog.get(3), id=10001, title="A Remake"))
+
+    rebuilt = ItemSimilarityIndex(catalog, k=recommender.similar_movies.k)
+    rebuilt.build()
+    assert neighbour_scores(recommender.similar_movies, catalog) == neighbour_scores(rebuilt, catalog)
+    for movie, score in recommender.similar_movies.neighbours(7):
+        assert score == pytest.approx(movie_similarity(movie, catalog.get(7)))
+
+
+def test_requests_never_build_the_index_and_match_it_once_built(tmp_path):
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(400, 3), quiet=True)
+    recommender.create_user_profile("viewer", {"genres": [GENRES[0]]})
+    recommender.watch_movie("viewer", 5)
+
+    scanned = recommender.get_recommendations("viewer", "because_you_watched")
+    assert not recommender.similar_movies.ready
+
+    path = str(tmp_path / "neighbours.json")
+    recommender.build_similarity_index(path)
+    built = recommender.get_recommendations("viewer", "because_you_watched")
+    assert [movie_similarity(movie, recommender.movies.get(5)) for movie in built] == \
+        [movie_similarity(movie, recommender.movies.get(5)) for movie in scanned]
+
+    restarted = NetflixMovieRecommender(storage=SyntheticStorage(400, 3), quiet=True)
+    restarted.build_similarity_index(path)
+    assert neighbour_scores(restarted.similar_movies, restarted.movies) == \
+        neighbour_scores(recommender.similar_movies, recommender.movies)
+
+
+def test_a_saved_index_is_rebuilt_when_the_catalog_has_changed(tmp_path):
+    path = str(tmp_path / "neighbours.json")
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.build_similarity_index(path)
+
+    restarted = NetflixMovieRecommender(quiet=True)
+    inception = next(movie for movie in restarted.movies if movie["title"] == "Inception")
+    restarted.movies.add(dict(inception, id=99, title="Inception 2"))
+    restarted.build_similarity_index(path)
+    assert 99 in [movie["id"] for movie, score in restarted.similar_movies.neighbours(inception["id"])]
+
+    reloaded = ItemSimilarityIndex(restarted.movies)
+    assert reloaded.load(path)
+    assert neighbour_scores(reloaded, restarted.movies) == neighbour_scores(restarted.similar_movies, restarted.movies)
@@ -0,0 +1,85 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_stats import period_key
+from netflix_storage import SQLiteStorage
+
+
+def rescan(recommender, username):
+    """get_user_stats and get_watch_time computed from the full history, as before the running aggregates"""
+    history = list(recommender.viewing_history[username])
+    ratings = recommender.ratings[username]
+    watched = [recommender.movies.get(record["movie_id"]) for record in history]
+    genres = Counter(genre for movie in watched for genre in movie["genre"])
+    stats = {
+        "total_movies_watched": len(history),
+        "total_hours_watched": round(sum(movie["duration"] for movie in watched) / 60, 1),
+        "favorite_genres": [genre for genre, _ in genres.most_common(3)],
+        "average_rating_given": round(sum(ratings.values()) / len(ratings), 1) if ratings else 0,
+        "watchlist_count": len(recommender.watchlist[username]),
+        "movies_rated": len(ratings),
+    }
+    hours = {}
+    for period in ("week", "month"):
+        minutes = Counter()
+        for record, movie in zip(history, watched):
+            minutes[period_key(record["watched_date"], period)] += movie["duration"]
+        hours[period] = {key: round(minutes[key] / 60, 1) for key in sorted(minutes)}
+    return stats, hours
+
+
+def test_running_aggregates_match_a_rescan_after_reopen(tmp_path):
+    path = str(tmp_path / "state.db")
+    recommender = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    recommender.create_user_profile("alice", {"favorite_genres": ["Drama"]})
+    events = [{"type": "watch", "username": "alice", "movie_id": movie_id, "watched_date": f"2024-{month:02d}-{day:02d}"}
+              for movie_id, month, day in [(1, 1, 3), (5, 1, 4), (9, 1, 29), (21, 2, 2), (22, 3, 15), (1, 3, 16)]]
+    events += [{"type": "rate", "username": "alice", "movie_id": movie_id, "rating": rating}
+               for movie_id, rating in [(1, 8), (5, 4), (1, 10), (21, 7), (5, 6)]]
+    recommender.ingest_events(events)
+    recommender.watch_movie("alice", 24)
+    recommender.rate_movie("alice", 24, 9)
+    recommender.add_to_watchlist("alice", 3)
+
+    stats, hours = rescan(recommender, "alice")
+    assert recommender.get_user_stats("alice") == stats
+    assert {period: recommender.get_watch_time("alice", period) for period in hours} == hours
+    assert stats["movies_rated"] == 4 and stats["average_rating_given"] == 8.0
+    recommender.close()
+
+    reopened = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    assert reopened.get_user_stats("alice") == stats
+    assert {period: reopened.get_watch_time("alice", period) for period in hours} == hours
+    reopened.close()
+
+
+def test_watch_time_buckets_by_iso_week_and_calendar_month():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {})
+    durations = {movie_id: recommender.movies.get(movie_id)["duration"] for movie_id in (1, 2, 3)}
+    recommender.ingest_events([
+        {"type": "watch", "username": "alice", "movie_id": 1, "watched_date": "2023-12-31T20:00:00"},
+        {"type": "watch", "username": "alice", "movie_id": 2, "watched_date": "2024-01-01T09:00:00"},
+        {"type": "watch", "username": "alice", "movie_id": 3, "watched_date": "2024-01-07T23:00:00"},
+    ])
+    assert recommender.get_watch_time("alice", "week") == {
+        "2023-W52": round(durations[1] / 60, 1),
+        "2024-W01": round((durations[2] + durations[3]) / 60, 1),
+    }
+    assert recommender.get_watch_time("alice", "month") == {
+        "2023-12": round(durations[1] / 60, 1),
+        "2024-01": round((durations[2] + durations[3]) / 60, 1),
+    }
+    assert period_key(datetime(2021, 1, 3), "week") == "2020-W53"
+
+
+def test_unknown_period_is_rejected():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.create_user_profile("alice", {})
+    with pytest.raises(ValueError):
+        recommender.get_watch_time("alice", "year")
+    with pytest.raises(ValueError):
+        period_key(datetime(2024, 1, 1), "day")
@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import time
+
+from netflix_movie import NetflixMovieRecommender
+from netflix_storage import SQLiteStorage, StorageBackend
+
+PROFILE = {"favorite_genres": ["Drama"], "disliked_genres": ["Horror"]}
+
+
+def committed_ratings(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM ratings").fetchone()[0]
+
+
+def test_idle_writes_are_committed_within_flush_interval(tmp_path):
+    path = str(tmp_path / "state.db")
+    storage = SQLiteStorage(path, batch_size=1000, flush_interval=0.1)
+    storage.save_rating("alice", 1, 8.0)
+    assert committed_ratings(path) == 0
+
+    deadline = time.monotonic() + 5
+    while committed_ratings(path) == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert committed_ratings(path) == 1
+    storage.close()
+
+
+def test_reads_see_uncommitted_writes_without_committing(tmp_path):
+    path = str(tmp_path / "state.db")
+    storage = SQLiteStorage(path, batch_size=1000, flush_interval=60)
+    storage.save_rating("alice", 1, 8.0)
+    assert storage.load_profile("nobody") is None
+    assert storage.load_ratings("alice") == {1: 8.0}
+    assert committed_ratings(path) == 0
+    storage.close()
+    assert committed_ratings(path) == 1
+
+
+def test_reopened_recommender_matches_in_memory_state(tmp_path):
+    path = str(tmp_path / "state.db")
+    recommender = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    recommender.create_user_profile("alice", PROFILE)
+    for movie_id in (1, 4, 9):
+        recommender.watch_movie("alice", movie_id)
+    recommender.rate_movie("alice", 4, 6)
+    recommender.add_to_watchlist("alice", 22)
+    expected = {
+        "history": list(recommender.viewing_history["alice"]),
+        "ratings": recommender.ratings["alice"],
+        "watchlist": recommender.watchlist["alice"],
+        "stats": recommender.get_user_stats("alice"),
+        "hours": recommender.get_watch_time("alice", "month"),
+        "for_you": recommender.get_recommendations("alice", "for_you"),
+    }
+    recommender.close()
+
+    reopened = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    assert list(reopened.viewing_history["alice"]) == expected["history"]
+    assert reopened.ratings["alice"] == expected["ratings"]
+    assert reopened.watchlist["alice"] == expected["watchlist"]
+    assert reopened.get_user_stats("alice") == expected["stats"]
+    assert reopened.get_watch_time("alice", "month") == expected["hours"]
+    assert reopened.get_recommendations("alice", "for_you") == expected["for_you"]
+    reopened.close()
+
+
+def test_recreated_profile_starts_empty_after_reopen(tmp_path):
+    path = str(tmp_path / "state.db")
+    recommender = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    recommender.create_user_profile("alice", PROFILE)
+    recommender.watch_movie("alice", 1)
+    recommender.rate_movie("alice", 2, 9)
+    recommender.add_to_watchlist("alice", 3)
+    recommender.create_user_profile("alice", PROFILE)
+    recommender.watch_movie("alice", 4)
+    recommender.close()
+
+    reopened = NetflixMovieRecommender(storage=SQLiteStorage(path), quiet=True)
+    assert [record["movie_id"] for record in reopened.viewing_history["alice"]] == [4]
+    assert reopened.ratings["alice"] == {}
+    assert reopened.watchlist["alice"] == []
+    assert reopened.get_user_stats("alice")["total_movies_watched"] == 1
+    reopened.close()
+
+
+class BlockingStorage(StorageBackend):
+    """In-memory storage whose watch writes wait until released"""
+
+    def __init__(self):
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.ratings = []
+
+    def append_watch(self, username, record):
+        self.writing.set()
+        assert self.release.wait(5)
+
+    def save_rating(self, username, movie_id, rating):
+        self.ratings.append(rating)
+
+
+def test_reads_do_not_wait_for_a_user_storage_write():
+    storage = BlockingStorage()
+    recommender = NetflixMovieRecommender(storage=storage, quiet=True)
+    recommender.create_user_profile("alice", PROFILE)
+    writer = threading.Thread(target=recommender.watch_movie, args=("alice", 1))
+    writer.start()
+    assert storage.writing.wait(5)
+
+    assert recommender.get_recommendations("alice", "for_you")
+    assert recommender.get_recommendations("alice", "top_picks")
+    assert recommender.get_user_stats("alice")["total_movies_watched"] == 1
+    rater = threading.Thread(target=recommender.rate_movie, args=("alice", 2, 9))
+    rater.start()
+    rater.join(0.2)
+    # Writes for the same user reach storage in the order they were made
+    assert storage.ratings == []
+
+    storage.release.set()
+    writer.join(5)
+    rater.join(5)
+    assert storage.ratings == [9]
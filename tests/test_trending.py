@@ -0,0 +1,38 @@
+import heapq
+from datetime import datetime
+
+from bench_suite import GENRES, SyntheticStorage
+from netflix_movie import NetflixMovieRecommender
+
+
+def highest_rated(movies, limit):
+    return heapq.nlargest(limit, movies, key=lambda movie: movie["rating"])
+
+
+def test_fallback_rows_match_a_full_ranking_and_follow_catalog_edits():
+    recommender = NetflixMovieRecommender(storage=SyntheticStorage(3000, 1), quiet=True)
+    catalog = recommender.movies
+    for genre in GENRES:
+        assert recommender.get_trending_movies(8, genre=genre) == highest_rated(catalog.by_genre(genre), 8)
+    assert recommender.get_trending_movies(100) == highest_rated(catalog.by_category("Netflix Original"), 100)
+
+    bottom = min(catalog.by_genre(GENRES[0]), key=lambda movie: movie["rating"])
+    catalog.update(bottom["id"], rating=10.0)
+    assert recommender.get_trending_movies(8, genre=GENRES[0])[0]["id"] == bottom["id"]
+
+
+def test_trending_titles_come_first_without_repeats():
+    recommender = NetflixMovieRecommender(quiet=True)
+    popular = recommender.movies.get(2)
+    recommender.trending.record(popular, datetime.now())
+    trending = recommender.get_trending_movies(8, category=popular["category"])
+    assert trending[0] is popular
+    assert len({movie["id"] for movie in trending}) == len(trending)
+
+
+def test_a_future_dated_viewing_counts_as_one_viewing_now():
+    recommender = NetflixMovieRecommender(quiet=True)
+    recommender.trending.record(recommender.movies.get(5), datetime(2100, 1, 1))
+    for _ in range(3):
+        recommender.trending.record(recommender.movies.get(3), datetime.now())
+    assert recommender.trending.top(2) == [3, 5]